@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON codec backends on real program files
+
+For every installed backend (msgspec, orjson, stdlib json) measures
+loads/dumps time over all files in data/clients/*/programs/ and checks
+that dumps() output is byte-identical to stdlib.
+
+Usage: python bench_json_codec.py [data_dir] [--rounds N]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import json_codec
+from layout import iter_program_files
+
+
+DEFAULT_DATA_DIR = Path(__file__).parent.parent / 'data'
+
+
+def bench(func, rounds: int) -> float:
+    """Best-of-rounds wall time in milliseconds"""
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    args = sys.argv[1:]
+    rounds = 20
+    if '--rounds' in args:
+        idx = args.index('--rounds')
+        rounds = int(args[idx + 1])
+        del args[idx:idx + 2]
+
+    data_dir = Path(args[0]) if args else DEFAULT_DATA_DIR
+    files = list(iter_program_files(data_dir))
+    if not files:
+        print(f"❌ Error: No program files found in {data_dir}")
+        sys.exit(1)
+
+    raws = [f.read_bytes() for f in files]
+    docs = [json_codec.loads(raw, backend='json') for raw in raws]
+    reference = [json_codec.dumps(doc, backend='json') for doc in docs]
+    total_kb = sum(len(raw) for raw in raws) / 1024
+
+    print(f"📄 {len(files)} program files, {total_kb:.0f} KB, best of {rounds} rounds")
+    print(f"   Default backend: {json_codec.BACKEND}\n")
+    print(f"   {'backend':<10} {'loads ms':>10} {'dumps ms':>10} {'speedup':>9}  identical")
+
+    baseline = None
+    for backend in reversed(json_codec.AVAILABLE_BACKENDS):
+        load_ms = bench(lambda: [json_codec.loads(raw, backend=backend) for raw in raws], rounds)
+        dump_ms = bench(lambda: [json_codec.dumps(doc, backend=backend) for doc in docs], rounds)
+        identical = all(
+            json_codec.dumps(doc, backend=backend) == ref
+            for doc, ref in zip(docs, reference)
+        )
+        if baseline is None:
+            baseline = load_ms + dump_ms
+        speedup = baseline / (load_ms + dump_ms)
+        mark = '✅' if identical else '❌'
+        print(f"   {backend:<10} {load_ms:>10.2f} {dump_ms:>10.2f} {speedup:>8.1f}x  {mark}")
+
+
+if __name__ == '__main__':
+    main()
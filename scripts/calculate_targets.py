@@ -8,13 +8,24 @@ Implements Excel formulas from SC60 PWL Template:
 - Session targets
 - ARI calculation (per week + overall block)
 
-Usage: python calculate_targets.py <program.json>
+Usage: python calculate_targets.py <program.json> [--patch <patch.json>] [--cache] [--profile <profile.json>]
+
+With --patch, the new `calculated` section is compared with the previous one
+and only the RFC 6902 JSON Patch is written to <patch.json>. The program file
+is rewritten only if something actually changed.
+
+With --cache, a previously computed result for identical inputs is reused
+from the content-addressed cache (see dedup.py).
+
+Sessions are placed on days from the client's profile `preferences`
+(see scheduler.py). The profile is taken from --profile, or found next to
+the program (clients/<slug>/profile.json).
 """
 
 import sys
 import json
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 from constants import (
     CHERNYAK_PATTERNS,
@@ -22,22 +33,39 @@ from constants import (
     SESSION_PATTERNS_3_DAYS,
     SESSION_PATTERNS_2_DAYS,
     DAYS_OF_WEEK,
+    DEFAULT_TRAINING_DAYS,
 )
 from utilities import (
     distribute_volume,
     distribute_intensity_zones,
     calculate_session_targets,
     calculate_ari,
+    calculate_load_metrics,
     convert_absolute_reps_to_percent,
     validate_distribution,
 )
+from json_patch import diff_calculated
+from dedup import calculate_with_cache
+from layout import is_client_file
+from scheduler import schedule_from_preferences
+from storage import (
+    read_json_versioned,
+    atomic_write_json,
+    save_if_unchanged,
+    ConcurrentModificationError,
+    LockTimeoutError,
+)
 
 
 def load_program(filepath: str) -> Dict:
     """Load program JSON file"""
+    return load_program_versioned(filepath)[0]
+
+
+def load_program_versioned(filepath: str) -> Tuple[Dict, str]:
+    """Load program JSON file together with its version token (for save_program)"""
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return read_json_versioned(filepath)
     except FileNotFoundError:
         print(f"❌ Error: File not found: {filepath}")
         sys.exit(1)
@@ -46,10 +74,19 @@ def load_program(filepath: str) -> Dict:
         sys.exit(1)
 
 
-def save_program(filepath: str, data: Dict):
-    """Save program JSON file"""
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+def save_program(filepath: str, data: Dict, expected_version: Optional[str] = None):
+    """
+    Save program JSON file atomically
+
+    With expected_version, the save fails with ConcurrentModificationError
+    if the file was changed by someone else since it was loaded. Files
+    outside clients/ (the web app's data/temp/ copies) have a single writer
+    and are written without locking.
+    """
+    if expected_version is not None and is_client_file(filepath):
+        save_if_unchanged(filepath, data, expected_version)
+    else:
+        atomic_write_json(filepath, data)
     print(f"✅ Saved: {filepath}\n")
 
 
@@ -98,6 +135,7 @@ def calculate_lift_targets(
     3. Weekly NL → Zone NL (intensity distribution)
     4. Weekly NL → Session NL (session distribution)
     5. Calculate ARI (per week + block overall)
+    6. Load metrics: tonnage, INOL, peak-zone reps (per session, week, block)
     """
     print(f"\n  📊 Calculating: {lift_name}")
 
@@ -207,20 +245,30 @@ def calculate_lift_targets(
         # Map sessions to days
         session_data = {}
         for i, day in enumerate(training_days[:len(sessions)]):
-            session_data[day] = sessions[i]
+            session_data[day] = {
+                **sessions[i],
+                **calculate_load_metrics(sessions[i]['zones'], weights),
+            }
+
+        week_metrics = calculate_load_metrics(zone_reps, weights)
 
         result[f'week_{week_num}'] = {
             'total_reps': week_total,
             'zones': zone_reps,
             'ari': week_ari,
+            **week_metrics,
             'sessions': session_data,
         }
 
-        print(f"     Week {week_num}: {week_total} NL, ARI={week_ari}%")
+        print(f"     Week {week_num}: {week_total} NL, ARI={week_ari}%, "
+              f"tonnage={week_metrics['tonnage']} kg, INOL={week_metrics['inol']}")
 
     # Calculate overall block ARI
     block_ari = calculate_ari(all_zone_reps)
+    block_metrics = calculate_load_metrics(all_zone_reps, weights)
     print(f"     Block ARI: {block_ari}%")
+    print(f"     Block tonnage: {block_metrics['tonnage']} kg, INOL: {block_metrics['inol']}, "
+          f"peak reps: {block_metrics['peak_reps']}")
 
     # Add summary
     result['_summary'] = {
@@ -229,15 +277,43 @@ def calculate_lift_targets(
         'block_ari': block_ari,
         'zone_distribution': zone_percentages,
         'zone_totals': all_zone_reps,
+        **block_metrics,
         'weights': weights,
     }
 
     return result
 
 
-def calculate_program_targets(program: Dict) -> Dict:
+def lift_session_loads(program: Dict) -> Dict[str, List[float]]:
+    """
+    Expected reps per weekly session for each lift (for scheduling)
+
+    Uses monthly volume split by the lift's session distribution.
+    Lifts without 1RM are left out, as in calculate_program_targets().
+    """
+    one_rms = program.get('client', {}).get('one_rm', {})
+    loads = {}
+    for lift_name, lift_config in program.get('input', {}).items():
+        if lift_name not in one_rms:
+            continue
+        session_distribution = get_session_pattern(
+            lift_config.get('session_distribution'),
+            lift_config.get('sessions_per_week', 3)
+        )
+        loads[lift_name] = [lift_config['volume'] * pct / 100 for pct in session_distribution]
+    return loads
+
+
+def calculate_program_targets(program: Dict, preferences: Optional[Dict] = None) -> Dict:
     """
     Calculate targets for entire program
+
+    Args:
+        program: Program dictionary
+        preferences: Client profile `preferences` (training_days,
+                     sessions_per_week, session_duration_minutes).
+                     If given, sessions are placed by scheduler.py,
+                     otherwise on default days.
     """
     print("🔢 Calculating program targets...")
 
@@ -258,13 +334,14 @@ def calculate_program_targets(program: Dict) -> Dict:
     sessions_per_week = first_lift_config.get('sessions_per_week', 3)
 
     # Default training days
-    default_days = {
-        2: ['monday', 'thursday'],
-        3: ['monday', 'wednesday', 'friday'],
-        4: ['monday', 'tuesday', 'thursday', 'friday'],
-        5: ['monday', 'tuesday', 'wednesday', 'friday', 'saturday'],
-    }
-    training_days = default_days.get(sessions_per_week, ['monday', 'wednesday', 'friday'])
+    training_days = DEFAULT_TRAINING_DAYS.get(sessions_per_week, DEFAULT_TRAINING_DAYS[3])
+
+    # Per-lift days from client preferences
+    lift_days = {}
+    if preferences:
+        lift_days = schedule_from_preferences(lift_session_loads(program), preferences)
+        for lift_name, days in lift_days.items():
+            print(f"  📅 {lift_name}: {', '.join(days)}")
 
     # Calculate for each lift
     calculated = {}
@@ -280,7 +357,7 @@ def calculate_program_targets(program: Dict) -> Dict:
                 lift_config,
                 skill_level,
                 weeks,
-                training_days
+                lift_days.get(lift_name, training_days)
             )
             calculated[lift_name] = lift_targets
 
@@ -291,18 +368,70 @@ def calculate_program_targets(program: Dict) -> Dict:
     return calculated
 
 
+def save_patch(filepath: str, patch: List[Dict]):
+    """Save JSON Patch file"""
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(patch, f, indent=2, ensure_ascii=False)
+    print(f"✅ Saved patch ({len(patch)} operations): {filepath}\n")
+
+
+def load_preferences(program_path: str, profile_path: Optional[str] = None) -> Optional[Dict]:
+    """
+    Load training preferences from client profile
+
+    Without explicit profile_path, looks for clients/<slug>/profile.json
+    next to the program's programs/ directory.
+    """
+    if profile_path is None:
+        program_dir = Path(program_path).resolve().parent
+        candidate = program_dir.parent / 'profile.json'
+        if program_dir.name != 'programs' or not candidate.exists():
+            return None
+        profile_path = str(candidate)
+
+    profile = load_program(profile_path)
+    preferences = profile.get('preferences')
+    if preferences:
+        print(f"📅 Using training preferences from: {profile_path}\n")
+    return preferences
+
+
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python calculate_targets.py <program.json>")
+    args = sys.argv[1:]
+    patch_path = None
+    if '--patch' in args:
+        idx = args.index('--patch')
+        if idx + 1 >= len(args):
+            print("❌ Error: --patch requires an output file")
+            sys.exit(1)
+        patch_path = args[idx + 1]
+        del args[idx:idx + 2]
+
+    profile_path = None
+    if '--profile' in args:
+        idx = args.index('--profile')
+        if idx + 1 >= len(args):
+            print("❌ Error: --profile requires a profile file")
+            sys.exit(1)
+        profile_path = args[idx + 1]
+        del args[idx:idx + 2]
+
+    use_cache = '--cache' in args
+    if use_cache:
+        args.remove('--cache')
+
+    if len(args) < 1:
+        print("Usage: python calculate_targets.py <program.json> [--patch <patch.json>] [--cache] [--profile <profile.json>]")
         print("\nExample:")
         print("  python calculate_targets.py ../data/clients/katerina-balasova/programs/2025-01-20_prep_squat.json")
+        print("  python calculate_targets.py program.json --patch program.patch.json")
         sys.exit(1)
 
-    filepath = sys.argv[1]
+    filepath = args[0]
     print(f"📄 Loading: {filepath}\n")
 
     # Load program
-    program = load_program(filepath)
+    program, version = load_program_versioned(filepath)
 
     # Validate required fields
     if 'input' not in program:
@@ -313,15 +442,35 @@ def main():
         print("❌ Error: No 'client.one_rm' found in program JSON")
         sys.exit(1)
 
+    preferences = load_preferences(filepath, profile_path)
+
     # Calculate targets
     try:
-        calculated = calculate_program_targets(program)
-
-        # Add to program
-        program['calculated'] = calculated
-
-        # Save back
-        save_program(filepath, program)
+        if use_cache:
+            calculated, cache_hit = calculate_with_cache(program, preferences=preferences)
+            if cache_hit:
+                print("♻️  Reused cached calculation (identical inputs)")
+        else:
+            calculated = calculate_program_targets(program, preferences)
+
+        if patch_path:
+            # Emit delta against previous calculation
+            patch = diff_calculated(program.get('calculated'), calculated)
+            save_patch(patch_path, patch)
+
+            if patch:
+                # Write the full result, not the patched dict: `add` ops would
+                # append keys and change key order vs. a normal run
+                program['calculated'] = calculated
+                save_program(filepath, program, version)
+            else:
+                print("✅ No changes in calculated targets, program not rewritten\n")
+        else:
+            # Add to program
+            program['calculated'] = calculated
+
+            # Save back
+            save_program(filepath, program, version)
 
         print("✅ Calculation complete!")
         print(f"   Total lifts processed: {len(calculated)}")
@@ -333,6 +482,11 @@ def main():
             print(f"     Total NL: {summary.get('actual_nl', 0)}")
             print(f"     Block ARI: {summary.get('block_ari', 0)}%")
 
+    except (ConcurrentModificationError, LockTimeoutError) as e:
+        print(f"\n❌ Save failed: {e}")
+        print("   Reload the program and try again")
+        sys.exit(1)
+
     except Exception as e:
         print(f"\n❌ Calculation failed: {e}")
         import traceback
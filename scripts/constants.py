@@ -84,6 +84,12 @@ ZONE_PERCENTAGES = {
     "95": 95,
 }
 
+# Program files (web form, calculated targets) store the 91-94% zone
+# (92.5% of 1RM) under key '90'
+PROGRAM_ZONE_ALIASES = {
+    "90": "92",
+}
+
 # Recommended patterns for competition
 # Source: CLAUDE.md - "Recommended patterns pro Competition"
 COMPETITION_PATTERNS = {
@@ -137,8 +143,26 @@ INTENSITY_DISTRIBUTION_GUIDELINES = {
     },
 }
 
+# Zones at or above this intensity (% of 1RM) count as peak-zone exposure
+PEAK_ZONE_MIN_INTENSITY = 90
+
 # Default rounding values (kg)
 DEFAULT_ROUNDING = 2.5
 
 # Days of week
 DAYS_OF_WEEK = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+# Default training days by sessions per week (when no client preferences)
+DEFAULT_TRAINING_DAYS = {
+    2: ["monday", "thursday"],
+    3: ["monday", "wednesday", "friday"],
+    4: ["monday", "tuesday", "thursday", "friday"],
+    5: ["monday", "tuesday", "wednesday", "friday", "saturday"],
+}
+
+# Approximate time one lift takes within a training session (minutes)
+# Used to turn preferences.session_duration_minutes into max lifts per day
+LIFT_SESSION_MINUTES = 30
+
+# Lifts tracked in one_rm_history
+LIFTS = ["squat", "bench_press", "deadlift", "overhead_press"]
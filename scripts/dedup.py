@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Content-addressed deduplication for StrongCode data
+
+1. Calculation cache: `calculated` results are stored under the hash of the
+   canonical calculation inputs, so the same block recalculated under a
+   different filename is never computed twice.
+2. Duplicate report: finds byte-identical files in the data tree and can
+   collapse them to hard links.
+
+Usage:
+    python dedup.py report [data_dir] [--link] [--all]
+    python dedup.py cache-stats [data_dir]
+"""
+
+import sys
+import os
+import json
+import hashlib
+import argparse
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from layout import client_index
+from storage import atomic_write_json
+
+
+# Bump when calculate_targets.py output changes, so old cache entries are not reused
+CALCULATION_VERSION = 3
+
+# Default data directory (relative to this script)
+DEFAULT_DATA_DIR = Path(__file__).parent.parent / 'data'
+
+# Calculation cache directory
+DEFAULT_CACHE_DIR = DEFAULT_DATA_DIR / 'cache' / 'calculated'
+
+# Program statuses that are never edited again and can safely share inodes
+LINKABLE_STATUSES = ('completed', 'archived')
+
+
+def canonical_json(data) -> str:
+    """Serialize JSON deterministically (sorted keys, no whitespace)"""
+    return json.dumps(data, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+
+def calculation_key(program: Dict, preferences: Optional[Dict] = None) -> str:
+    """
+    Content hash of everything calculate_program_targets() depends on
+
+    That is `input` + `program_info`, plus the client's skill level and the
+    set of lifts with a 1RM (lifts without one are skipped). The 1RM values
+    themselves don't enter the calculation - weights come from `input`.
+    Scheduling preferences are included when given.
+
+    Returns:
+        sha256 hex digest
+    """
+    client = program.get('client', {})
+    payload = {
+        'version': CALCULATION_VERSION,
+        'input': program.get('input', {}),
+        'program_info': program.get('program_info', {}),
+        'delta': client.get('delta', 'intermediate'),
+        'lifts_with_1rm': sorted(client.get('one_rm', {}).keys()),
+    }
+    if preferences:
+        payload['schedule'] = {
+            key: preferences.get(key)
+            for key in ('training_days', 'sessions_per_week', 'session_duration_minutes')
+        }
+    return hashlib.sha256(canonical_json(payload).encode('utf-8')).hexdigest()
+
+
+def cache_path(cache_dir: Path, key: str) -> Path:
+    """Cache entry path: <cache_dir>/<first 2 hex chars>/<key>.json"""
+    return Path(cache_dir) / key[:2] / f'{key}.json'
+
+
+def get_cached_calculated(
+    program: Dict,
+    cache_dir: Path,
+    preferences: Optional[Dict] = None
+) -> Optional[Dict]:
+    """
+    Look up previously computed `calculated` section
+
+    Returns:
+        Cached `calculated` dict, or None on cache miss
+    """
+    path = cache_path(cache_dir, calculation_key(program, preferences))
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)['calculated']
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        return None
+
+
+def store_calculated(
+    program: Dict,
+    calculated: Dict,
+    cache_dir: Path,
+    preferences: Optional[Dict] = None
+) -> Path:
+    """Store `calculated` section under the program's calculation key"""
+    key = calculation_key(program, preferences)
+    path = cache_path(cache_dir, key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_json(path, {'key': key, 'calculated': calculated})
+    return path
+
+
+def calculate_with_cache(
+    program: Dict,
+    cache_dir: Path = DEFAULT_CACHE_DIR,
+    preferences: Optional[Dict] = None
+) -> Tuple[Dict, bool]:
+    """
+    Return `calculated` for a program, computing it only on cache miss
+
+    Returns:
+        Tuple of (calculated, cache_hit)
+    """
+    from calculate_targets import calculate_program_targets
+
+    cached = get_cached_calculated(program, cache_dir, preferences)
+    if cached is not None:
+        return cached, True
+
+    calculated = calculate_program_targets(program, preferences)
+    store_calculated(program, calculated, cache_dir, preferences)
+    return calculated, False
+
+
+def file_digest(filepath: Path) -> str:
+    """sha256 of file contents"""
+    h = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def iter_data_files(data_dir: Path):
+    """Yield all JSON data files (skipping the calculation cache)"""
+    cache_dir = Path(data_dir) / 'cache'
+    for path in sorted(Path(data_dir).rglob('*.json')):
+        if cache_dir in path.parents or path.name.startswith('.'):
+            continue
+        yield path
+
+
+def find_duplicate_files(data_dir: Path) -> List[List[Path]]:
+    """
+    Find groups of byte-identical files
+
+    Files are grouped by size first; only same-size files get hashed.
+
+    Returns:
+        List of groups (each group has 2+ paths, sorted)
+    """
+    by_size = defaultdict(list)
+    for path in iter_data_files(data_dir):
+        by_size[path.stat().st_size].append(path)
+
+    groups = []
+    for paths in by_size.values():
+        if len(paths) < 2:
+            continue
+        by_digest = defaultdict(list)
+        for path in paths:
+            by_digest[file_digest(path)].append(path)
+        groups.extend(sorted(group) for group in by_digest.values() if len(group) > 1)
+
+    return sorted(groups)
+
+
+def load_json_object(path: Path) -> Dict:
+    """Load JSON file, {} if it is missing, invalid or not an object"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def find_duplicate_calculations(data_dir: Path) -> List[List[Path]]:
+    """
+    Find programs that share the same calculation inputs
+
+    Keyed like `calculate_targets.py --cache`, i.e. with the scheduling
+    preferences of the client's profile.
+
+    Returns:
+        List of groups (each group has 2+ program paths, sorted)
+    """
+    by_key = defaultdict(list)
+    for cdir, programs in client_index(data_dir).values():
+        preferences = load_json_object(cdir / 'profile.json').get('preferences')
+        for path in programs:
+            program = load_json_object(path)
+            if 'input' in program:
+                by_key[calculation_key(program, preferences)].append(path)
+
+    return sorted(sorted(group) for group in by_key.values() if len(group) > 1)
+
+
+def is_linkable(path: Path) -> bool:
+    """
+    Check whether file may share an inode with its duplicates
+
+    The web app rewrites files in place, which would change every hard-linked
+    copy at once, so only finished programs are linked by default. Files
+    that aren't programs (e.g. users.json, a top-level array) never are.
+    """
+    return load_json_object(path).get('meta', {}).get('status') in LINKABLE_STATUSES
+
+
+def link_duplicates(group: List[Path]) -> int:
+    """
+    Replace duplicates with hard links to the first file of the group
+
+    Returns:
+        Bytes saved
+    """
+    source = group[0]
+    saved = 0
+    for path in group[1:]:
+        if os.path.samefile(source, path):
+            continue
+        tmp_path = path.parent / f'.{path.name}.link.tmp'
+        os.link(source, tmp_path)
+        os.replace(tmp_path, path)
+        saved += source.stat().st_size
+    return saved
+
+
+def report(data_dir: Path, link: bool = False, link_all: bool = False):
+    """Print duplicate report and optionally hard-link duplicates"""
+    print(f"🔍 Scanning: {data_dir}\n")
+
+    groups = find_duplicate_files(data_dir)
+    wasted = 0
+    saved = 0
+
+    if not groups:
+        print("✅ No byte-identical files found")
+
+    for group in groups:
+        size = group[0].stat().st_size
+        unique_inodes = {p.stat().st_ino for p in group}
+        wasted += size * (len(unique_inodes) - 1)
+        print(f"📄 {len(group)} identical files ({size} bytes each):")
+        for path in group:
+            print(f"     {path.relative_to(data_dir)}")
+
+        if link and len(unique_inodes) > 1:
+            if link_all or all(is_linkable(p) for p in group):
+                saved += link_duplicates(group)
+                print("   🔗 Linked")
+            else:
+                print("   ⚠️  Skipped linking (not only completed/archived programs, use --all to force)")
+        print()
+
+    calc_groups = find_duplicate_calculations(data_dir)
+    if calc_groups:
+        print("♻️  Programs with identical calculation inputs (served from cache):")
+        for group in calc_groups:
+            print(f"   {len(group)} programs:")
+            for path in group:
+                print(f"     {path.relative_to(data_dir)}")
+        print()
+
+    print(f"   Duplicate groups: {len(groups)}")
+    print(f"   Reclaimable: {wasted} bytes")
+    if link:
+        print(f"   Saved: {saved} bytes")
+
+
+def cache_stats(data_dir: Path):
+    """Print calculation cache statistics"""
+    cache_dir = Path(data_dir) / 'cache' / 'calculated'
+    entries = list(cache_dir.glob('*/*.json'))
+    total = sum(p.stat().st_size for p in entries)
+    print(f"📦 Calculation cache: {cache_dir}")
+    print(f"   Entries: {len(entries)}")
+    print(f"   Size: {total} bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Content-addressed deduplication for StrongCode data')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    report_parser = subparsers.add_parser('report', help='Find duplicate files')
+    report_parser.add_argument('data_dir', nargs='?', default=str(DEFAULT_DATA_DIR))
+    report_parser.add_argument('--link', action='store_true', help='Collapse duplicates to hard links')
+    report_parser.add_argument('--all', action='store_true', help='Also link draft/active programs')
+
+    stats_parser = subparsers.add_parser('cache-stats', help='Show calculation cache statistics')
+    stats_parser.add_argument('data_dir', nargs='?', default=str(DEFAULT_DATA_DIR))
+
+    args = parser.parse_args()
+    data_dir = Path(args.data_dir).resolve()
+
+    if not data_dir.is_dir():
+        print(f"❌ Error: Directory not found: {data_dir}")
+        sys.exit(1)
+
+    if args.command == 'report':
+        report(data_dir, link=args.link, link_all=args.all)
+    elif args.command == 'cache-stats':
+        cache_stats(data_dir)
+
+
+if __name__ == '__main__':
+    main()
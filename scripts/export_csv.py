@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Export all calculated programs to CSV (for cross-checking in Excel)
+
+Streams one row per (client, program, lift, week, day, zone, reps, weight).
+Programs are read one at a time and rows are written as they are produced,
+so memory use doesn't grow with the number of programs.
+
+Usage:
+    python export_csv.py [-o out.csv] [--client SLUG ...] [--from DATE] [--to DATE] [--block BLOCK]
+
+Examples:
+    python export_csv.py -o all.csv
+    python export_csv.py --client katerina-balasova --from 2026-01-01 --block prep
+"""
+
+import sys
+import csv
+import argparse
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import json_codec
+import layout
+
+
+DEFAULT_DATA_DIR = Path(__file__).parent.parent / 'data'
+
+CSV_COLUMNS = ['client', 'program', 'lift', 'week', 'day', 'zone', 'reps', 'weight']
+
+
+def iter_program_files(data_dir: Path, clients: Optional[List[str]] = None) -> Iterator[Path]:
+    """
+    Yield program files in stable order (client, filename)
+
+    Args:
+        data_dir: Data root (containing clients/)
+        clients: Only these client slugs (default: all)
+    """
+    yield from layout.iter_program_files(data_dir, clients)
+
+
+def program_matches(
+    program: Dict,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    block: Optional[str] = None
+) -> bool:
+    """Check program against date range (start_date, inclusive) and block filters"""
+    info = program.get('program_info', {})
+    start_date = info.get('start_date', '')
+    if date_from and start_date < date_from:
+        return False
+    if date_to and start_date > date_to:
+        return False
+    if block and info.get('block') != block:
+        return False
+    return True
+
+
+def week_number(week_key: str) -> int:
+    """'week_3' -> 3"""
+    return int(week_key.split('_', 1)[1])
+
+
+def iter_program_rows(client: str, program_name: str, program: Dict) -> Iterator[List]:
+    """
+    Yield CSV rows for one program
+
+    Weights come from calculated[lift]['_summary']['weights'].
+    Zones with 0 reps are skipped.
+    """
+    for lift, targets in program.get('calculated', {}).items():
+        weights = targets.get('_summary', {}).get('weights', {})
+        week_keys = sorted((k for k in targets if k.startswith('week_')), key=week_number)
+
+        for week_key in week_keys:
+            for day, session in targets[week_key].get('sessions', {}).items():
+                for zone, reps in session.get('zones', {}).items():
+                    if reps:
+                        yield [
+                            client, program_name, lift, week_number(week_key),
+                            day, zone, reps, weights.get(zone, ''),
+                        ]
+
+
+def export_csv(
+    out,
+    data_dir: Path = DEFAULT_DATA_DIR,
+    clients: Optional[List[str]] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    block: Optional[str] = None
+) -> Dict[str, int]:
+    """
+    Stream CSV export of all matching programs
+
+    Args:
+        out: Text file object to write to
+        data_dir: Data root
+        clients: Client slugs filter
+        date_from: Earliest program start_date (YYYY-MM-DD)
+        date_to: Latest program start_date (YYYY-MM-DD)
+        block: Block filter (prep/comp/...)
+
+    Returns:
+        Counts: {'programs': ..., 'rows': ...}
+    """
+    writer = csv.writer(out)
+    writer.writerow(CSV_COLUMNS)
+    stats = {'programs': 0, 'rows': 0}
+
+    for path in iter_program_files(data_dir, clients):
+        try:
+            program = json_codec.loads(path.read_bytes())
+        except json_codec.JSONDecodeError as e:
+            print(f"⚠️  Warning: Skipping invalid JSON {path}: {e}", file=sys.stderr)
+            continue
+
+        if not program_matches(program, date_from, date_to, block):
+            continue
+
+        client = path.parent.parent.name
+        for row in iter_program_rows(client, path.stem, program):
+            writer.writerow(row)
+            stats['rows'] += 1
+        stats['programs'] += 1
+
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export calculated programs to CSV')
+    parser.add_argument('-o', '--output', help='Output CSV file (default: stdout)')
+    parser.add_argument('--data-dir', default=str(DEFAULT_DATA_DIR), help='Data directory')
+    parser.add_argument('--client', action='append', help='Client slug (repeatable)')
+    parser.add_argument('--from', dest='date_from', help='Programs starting on/after YYYY-MM-DD')
+    parser.add_argument('--to', dest='date_to', help='Programs starting on/before YYYY-MM-DD')
+    parser.add_argument('--block', help='Block (prep, comp, ...)')
+    args = parser.parse_args()
+
+    filters = dict(
+        data_dir=Path(args.data_dir),
+        clients=args.client,
+        date_from=args.date_from,
+        date_to=args.date_to,
+        block=args.block,
+    )
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8', newline='') as f:
+            stats = export_csv(f, **filters)
+        print(f"✅ Exported {stats['rows']} rows from {stats['programs']} programs: {args.output}")
+    else:
+        export_csv(sys.stdout, **filters)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+1RM progression forecasting for the whole roster
+
+Fits a weighted least-squares trend line per (client, lift) over the dated
+`one_rm_history` entries of all profiles at once (numpy, no per-client loop):
+- `tested` entries weigh TESTED_WEIGHT times more than estimates
+- older entries fade out with a RECENCY_HALF_LIFE_DAYS half-life
+- the trend is extrapolated at most MAX_FORECAST_DAYS past the latest entry
+
+Forecasts are rounded to DEFAULT_ROUNDING and can be written into
+`client.one_rm` of draft programs (at their program_info.start_date),
+with weights retargeted as in retarget.py.
+
+--date only sets the date of the roster printout; draft programs are
+always forecast at their own start_date.
+
+Usage:
+    python forecast.py [data_dir] [--date YYYY-MM-DD] [--apply]
+"""
+
+import sys
+import argparse
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import json_codec
+from constants import LIFTS, DEFAULT_ROUNDING
+from layout import ClientIndex, client_index, iter_client_dirs, iter_program_files
+from storage import read_json_versioned, save_if_unchanged, ConcurrentModificationError, LockTimeoutError
+from retarget import retarget_program
+
+
+DEFAULT_DATA_DIR = Path(__file__).parent.parent / 'data'
+
+# Weight of a tested (competition/true max) entry relative to an estimate
+TESTED_WEIGHT = 3.0
+
+# Entries this many days older than the client's latest entry count half
+RECENCY_HALF_LIFE_DAYS = 365
+
+# Trend is not extrapolated further than this past the latest entry
+MAX_FORECAST_DAYS = 180
+
+
+def to_day_number(date_str: str) -> int:
+    """'2025-01-15' -> days since 1970-01-01"""
+    return int(np.datetime64(date_str[:10], 'D').astype(np.int64))
+
+
+def load_profiles(data_dir: Path = DEFAULT_DATA_DIR, index: Optional[ClientIndex] = None) -> Dict[str, Dict]:
+    """Load all client profiles: slug -> profile"""
+    return {
+        client_dir.name: json_codec.loads((client_dir / 'profile.json').read_bytes())
+        for client_dir in iter_client_dirs(data_dir, index)
+        if (client_dir / 'profile.json').exists()
+    }
+
+
+def collect_history(profiles: Dict[str, Dict]):
+    """
+    Flatten one_rm_history of all profiles into arrays
+
+    Returns:
+        Tuple of (group_keys, group_idx, x, y, tested)
+        group_keys: list of (client, lift), index = group id
+        group_idx, x (day number), y (1RM), tested: arrays, one item per entry
+    """
+    group_ids: Dict[Tuple[str, str], int] = {}
+    group_idx, xs, ys, tested = [], [], [], []
+
+    for client, profile in profiles.items():
+        for entry in profile.get('one_rm_history', []):
+            if not entry.get('date'):
+                continue
+            day = to_day_number(entry['date'])
+            for lift in LIFTS:
+                value = entry.get(lift)
+                if not value:
+                    continue
+                key = (client, lift)
+                if key not in group_ids:
+                    group_ids[key] = len(group_ids)
+                group_idx.append(group_ids[key])
+                xs.append(day)
+                ys.append(value)
+                tested.append(bool(entry.get('tested')))
+
+    return (
+        list(group_ids.keys()),
+        np.asarray(group_idx, dtype=np.int64),
+        np.asarray(xs, dtype=np.float64),
+        np.asarray(ys, dtype=np.float64),
+        np.asarray(tested, dtype=bool),
+    )
+
+
+def fit_trends(group_idx: np.ndarray, x: np.ndarray, y: np.ndarray, tested: np.ndarray, n_groups: int):
+    """
+    Weighted least squares line per group, all groups in one vectorized pass
+
+    Groups with a single entry (or all entries on one date) get a flat line.
+
+    Returns:
+        Tuple of arrays (x_mean, y_mean, slope, latest), one item per group;
+        prediction = y_mean + slope * (x - x_mean), latest = last entry day
+    """
+    latest = np.full(n_groups, -np.inf)
+    np.maximum.at(latest, group_idx, x)
+    age = latest[group_idx] - x
+
+    w = np.where(tested, TESTED_WEIGHT, 1.0) * 0.5 ** (age / RECENCY_HALF_LIFE_DAYS)
+
+    sw = np.bincount(group_idx, weights=w, minlength=n_groups)
+    x_mean = np.bincount(group_idx, weights=w * x, minlength=n_groups) / sw
+    y_mean = np.bincount(group_idx, weights=w * y, minlength=n_groups) / sw
+
+    dx = x - x_mean[group_idx]
+    dy = y - y_mean[group_idx]
+    sxx = np.bincount(group_idx, weights=w * dx * dx, minlength=n_groups)
+    sxy = np.bincount(group_idx, weights=w * dx * dy, minlength=n_groups)
+
+    slope = np.divide(sxy, sxx, out=np.zeros(n_groups), where=sxx > 0)
+    return x_mean, y_mean, slope, latest
+
+
+def forecast_roster(
+    profiles: Dict[str, Dict],
+    requests: List[Tuple[str, str, str]],
+    rounding: float = DEFAULT_ROUNDING
+) -> List[Optional[float]]:
+    """
+    Forecast 1RM for many (client, lift, date) requests in one batch
+
+    Args:
+        profiles: slug -> profile
+        requests: List of (client_slug, lift, 'YYYY-MM-DD')
+        rounding: Round forecasts to this increment (kg)
+
+    Returns:
+        Forecast per request (None if the client has no history for the lift)
+
+    Example:
+        >>> forecast_roster(profiles, [('katerina-balasova', 'squat', '2025-03-01')])
+        [145.0]
+    """
+    if not requests:
+        return []
+
+    group_keys, group_idx, x, y, tested = collect_history(profiles)
+    if not group_keys:
+        return [None] * len(requests)
+
+    x_mean, y_mean, slope, latest = fit_trends(group_idx, x, y, tested, len(group_keys))
+
+    group_ids = {key: i for i, key in enumerate(group_keys)}
+    req_group = np.asarray([group_ids.get((c, l), -1) for c, l, _ in requests], dtype=np.int64)
+    req_x = np.asarray([to_day_number(d) for _, _, d in requests], dtype=np.float64)
+
+    known = req_group >= 0
+    g = np.where(known, req_group, 0)
+    req_x = np.minimum(req_x, latest[g] + MAX_FORECAST_DAYS)
+    predicted = y_mean[g] + slope[g] * (req_x - x_mean[g])
+    predicted = np.maximum(np.round(predicted / rounding) * rounding, 0)
+
+    return [float(value) if ok else None for value, ok in zip(predicted, known)]
+
+
+def forecast_draft_programs(
+    data_dir: Path = DEFAULT_DATA_DIR,
+    apply: bool = False,
+    index: Optional[ClientIndex] = None
+) -> List[Dict]:
+    """
+    Forecast client.one_rm for all draft programs at their start_date
+
+    Args:
+        data_dir: Data root
+        apply: Write forecasts into the programs and retarget their weights
+               (compare-and-swap save, each program on its own)
+        index: client_index() of this run (default: build one)
+
+    Returns:
+        List of {'path', 'one_rm' (old), 'forecast' (new)}, plus 'error'
+        for programs that couldn't be saved (changed meanwhile / locked)
+    """
+    index = index if index is not None else client_index(data_dir)
+    profiles = load_profiles(data_dir, index)
+    programs = []
+    requests = []
+
+    for client in profiles:
+        for path in iter_program_files(data_dir, [client], index):
+            program, version = read_json_versioned(path)
+            if program.get('meta', {}).get('status') != 'draft':
+                continue
+            start_date = program.get('program_info', {}).get('start_date')
+            lifts = list(program.get('client', {}).get('one_rm', {}).keys())
+            if not start_date or not lifts:
+                continue
+            programs.append((path, program, version, lifts))
+            requests.extend((client, lift, start_date) for lift in lifts)
+
+    forecasts = iter(forecast_roster(profiles, requests))
+    results = []
+
+    for path, program, version, lifts in programs:
+        one_rm = program['client']['one_rm']
+        forecast = {}
+        for lift in lifts:
+            value = next(forecasts)
+            if value is not None:
+                forecast[lift] = value
+
+        result = {'path': path, 'one_rm': dict(one_rm), 'forecast': forecast}
+        results.append(result)
+
+        if apply and retarget_program(program, forecast):
+            try:
+                save_if_unchanged(path, program, version)
+            except (ConcurrentModificationError, LockTimeoutError) as e:
+                result['error'] = str(e)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Forecast 1RM progression for the whole roster')
+    parser.add_argument('data_dir', nargs='?', default=str(DEFAULT_DATA_DIR))
+    parser.add_argument('--date', default=date.today().isoformat(),
+                        help='Date of the roster forecast (default: today); drafts use their start_date')
+    parser.add_argument('--apply', action='store_true', help='Write forecasts into draft programs (client.one_rm + weights)')
+    args = parser.parse_args()
+
+    data_dir = Path(args.data_dir)
+    index = client_index(data_dir)
+    profiles = load_profiles(data_dir, index)
+    requests = [(client, lift, args.date) for client in profiles for lift in LIFTS]
+    forecasts = forecast_roster(profiles, requests)
+
+    print(f"📈 1RM forecast for {args.date}\n")
+    for (client, lift, _), value in zip(requests, forecasts):
+        if value is not None:
+            print(f"   {client:<25} {lift:<15} {value:>7.1f} kg")
+
+    print("\n📄 Draft programs (forecast at start_date):\n")
+    results = forecast_draft_programs(data_dir, apply=args.apply, index=index)
+    for result in results:
+        print(f"   {result['path'].relative_to(data_dir)}")
+        for lift, value in result['forecast'].items():
+            old = result['one_rm'].get(lift)
+            print(f"     {lift}: {old} → {value}")
+        if 'error' in result:
+            print(f"     ❌ Not saved: {result['error']}")
+
+    if args.apply:
+        failed = sum(1 for result in results if 'error' in result)
+        if failed:
+            print(f"\n⚠️  {failed} draft programs not saved; run again to retry them")
+            sys.exit(1)
+        print("\n✅ Draft programs updated (1RM and weights)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+"""
+Pluggable JSON codec for StrongCode data files
+
+Uses the fastest installed backend: orjson > msgspec > stdlib json
+(order from bench_json_codec.py on our program files).
+Output of dumps() is byte-identical to
+`json.dumps(data, indent=2, ensure_ascii=False)` for any data, so switching
+backends never changes files on disk: the fast backends write NaN/Infinity
+as null and exponent floats as 1e16 / 1e-7 (stdlib: NaN, 1e+16, 1e-07), so
+data containing such floats is always encoded by stdlib.
+
+Force a backend with STRONGCODE_JSON_BACKEND=orjson|msgspec|json.
+
+With msgspec installed, decode_program(raw, typed=True) returns typed
+structs for `program_info`, `input` and `calculated` instead of plain dicts.
+"""
+
+import os
+import json
+import math
+from typing import Any, Dict, Optional, Union
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Decode errors from every backend are re-raised as this (stdlib) type
+JSONDecodeError = json.JSONDecodeError
+
+AVAILABLE_BACKENDS = [
+    name for name, module in (('orjson', orjson), ('msgspec', msgspec), ('json', json))
+    if module is not None
+]
+
+
+def _select_backend() -> str:
+    """Pick backend from environment or fastest available"""
+    forced = os.environ.get('STRONGCODE_JSON_BACKEND')
+    if forced:
+        if forced not in AVAILABLE_BACKENDS:
+            raise ImportError(f"JSON backend not available: {forced} (available: {AVAILABLE_BACKENDS})")
+        return forced
+    return AVAILABLE_BACKENDS[0]
+
+
+BACKEND = _select_backend()
+
+
+def loads(raw: Union[bytes, str], backend: Optional[str] = None) -> Any:
+    """
+    Parse JSON document
+
+    Args:
+        raw: JSON text (bytes or str)
+        backend: Override backend (default: BACKEND)
+
+    Raises:
+        JSONDecodeError if the document is not valid JSON
+    """
+    backend = backend or BACKEND
+    try:
+        if backend == 'msgspec':
+            return msgspec.json.decode(raw)
+        if backend == 'orjson':
+            return orjson.loads(raw)
+    except JSONDecodeError:
+        raise
+    except Exception as e:  # msgspec.DecodeError, invalid UTF-8
+        text = raw.decode('utf-8', errors='replace') if isinstance(raw, bytes) else raw
+        raise JSONDecodeError(str(e), text, 0) from e
+
+    if isinstance(raw, bytes):
+        raw = raw.decode('utf-8')
+    return json.loads(raw)
+
+
+# Floats outside this range are written in exponent notation
+PLAIN_FLOAT_MIN = 1e-4
+PLAIN_FLOAT_MAX = 1e16
+
+
+def _fast_backend_safe(data: Any) -> bool:
+    """
+    True if the fast backends encode data exactly like stdlib
+
+    They differ only for floats: non-finite values (null vs NaN/Infinity)
+    and exponent notation (1e16 vs 1e+16, 1e-7 vs 1e-07).
+    """
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+        elif isinstance(value, float) and value != 0.0:
+            if not math.isfinite(value) or not PLAIN_FLOAT_MIN <= abs(value) < PLAIN_FLOAT_MAX:
+                return False
+    return True
+
+
+def dumps(data: Any, indent: Optional[int] = 2, backend: Optional[str] = None) -> bytes:
+    """
+    Serialize to UTF-8 JSON bytes
+
+    Same output as `json.dumps(data, indent=indent, ensure_ascii=False)`.
+    The fast backends only handle indent=2 (the data file format); other
+    indents, values they can't encode (e.g. ints over 64 bits) and floats
+    they format differently (NaN/Infinity, exponent notation) use stdlib.
+
+    Args:
+        data: JSON-compatible data
+        indent: Indentation (2 for data files)
+        backend: Override backend (default: BACKEND)
+    """
+    backend = backend or BACKEND
+    if indent == 2 and backend != 'json' and _fast_backend_safe(data):
+        try:
+            if backend == 'msgspec':
+                return msgspec.json.format(msgspec.json.encode(data), indent=2)
+            if backend == 'orjson':
+                return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        except Exception:  # msgspec.EncodeError, orjson.JSONEncodeError
+            pass
+
+    return json.dumps(data, indent=indent, ensure_ascii=False).encode('utf-8')
+
+
+# Typed program structs (msgspec only)
+# Unknown fields are ignored, so older/newer files still decode.
+
+if msgspec is not None:
+    Number = Union[int, float]
+
+    class ProgramInfo(msgspec.Struct, kw_only=True):
+        block: Optional[str] = None
+        start_date: Optional[str] = None
+        end_date: Optional[str] = None
+        weeks: int = 4
+
+    class IntensityDistribution(msgspec.Struct, kw_only=True):
+        percent_65: Optional[Number] = msgspec.field(default=None, name='65_percent')
+        percent_75: Optional[Number] = msgspec.field(default=None, name='75_percent')
+        percent_85: Optional[Number] = msgspec.field(default=None, name='85_percent')
+        total_reps_90: int = msgspec.field(default=0, name='90_total_reps')
+        total_reps_95: int = msgspec.field(default=0, name='95_total_reps')
+
+    class LiftInput(msgspec.Struct, kw_only=True):
+        volume: int
+        rounding: Number = 2.5
+        weights: Dict[str, Number] = {}
+        intensity_distribution: IntensityDistribution
+        volume_pattern_main: str
+        volume_pattern_8190: Optional[str] = None
+        sessions_per_week: int = 3
+        session_distribution: Optional[str] = None
+
+    class SessionTargets(msgspec.Struct, kw_only=True):
+        total: int
+        zones: Dict[str, int]
+        tonnage: Optional[Number] = None
+        inol: Optional[Number] = None
+        peak_reps: Optional[int] = None
+
+    class WeekTargets(msgspec.Struct, kw_only=True):
+        total_reps: int
+        zones: Dict[str, int]
+        ari: Number
+        tonnage: Optional[Number] = None
+        inol: Optional[Number] = None
+        peak_reps: Optional[int] = None
+        sessions: Dict[str, SessionTargets]
+
+    class LiftSummary(msgspec.Struct, kw_only=True):
+        total_nl: int
+        actual_nl: int
+        block_ari: Number
+        zone_distribution: Dict[str, Number]
+        zone_totals: Dict[str, int]
+        tonnage: Optional[Number] = None
+        inol: Optional[Number] = None
+        peak_reps: Optional[int] = None
+        weights: Dict[str, Number]
+
+    class LiftTargets(msgspec.Struct, kw_only=True):
+        """Calculated targets of one lift (`week_N` keys + `_summary`)"""
+        weeks: Dict[str, WeekTargets]
+        summary: LiftSummary
+
+    class TypedProgram(msgspec.Struct, kw_only=True):
+        schema_version: str = '1.0'
+        meta: Dict[str, Any] = {}
+        client: Dict[str, Any] = {}
+        program_info: ProgramInfo
+        input: Dict[str, LiftInput]
+        calculated: Dict[str, LiftTargets] = {}
+
+
+def decode_program(raw: Union[bytes, str], typed: bool = False) -> Any:
+    """
+    Decode program file
+
+    Args:
+        raw: JSON text
+        typed: Return TypedProgram struct instead of dict (requires msgspec)
+
+    Returns:
+        Program dict, or TypedProgram
+
+    Raises:
+        JSONDecodeError if the document is not valid JSON
+        ImportError if typed=True and msgspec is not installed
+        msgspec.ValidationError if the program doesn't match the structs
+    """
+    data = loads(raw)
+    if not typed:
+        return data
+
+    if msgspec is None:
+        raise ImportError("Typed decoding requires msgspec (pip install msgspec)")
+
+    # `calculated[lift]` mixes week_N entries with _summary; split them
+    calculated = {
+        lift: {
+            'weeks': {key: value for key, value in targets.items() if key != '_summary'},
+            'summary': targets.get('_summary', {}),
+        }
+        for lift, targets in data.get('calculated', {}).items()
+    }
+    return msgspec.convert({**data, 'calculated': calculated}, TypedProgram)
@@ -0,0 +1,212 @@
+"""
+JSON Patch (RFC 6902) helpers for StrongCode programs
+
+Used to ship only the changed part of a recalculated program instead of
+rewriting and rereading the whole file.
+
+Supported operations: add, remove, replace, test
+"""
+
+import copy
+from typing import Any, Dict, List, Optional
+
+
+def escape_pointer_token(token: str) -> str:
+    """Escape a single JSON Pointer token (RFC 6901)"""
+    return str(token).replace('~', '~0').replace('/', '~1')
+
+
+def unescape_pointer_token(token: str) -> str:
+    """Unescape a single JSON Pointer token (RFC 6901)"""
+    return token.replace('~1', '/').replace('~0', '~')
+
+
+def split_pointer(pointer: str) -> List[str]:
+    """
+    Split JSON Pointer into unescaped tokens
+
+    Example:
+        >>> split_pointer('/calculated/squat/week_1')
+        ['calculated', 'squat', 'week_1']
+    """
+    if pointer == '':
+        return []
+    if not pointer.startswith('/'):
+        raise ValueError(f"Invalid JSON Pointer: {pointer!r}")
+    return [unescape_pointer_token(t) for t in pointer[1:].split('/')]
+
+
+def _same_value(a: Any, b: Any) -> bool:
+    """Equal and same JSON type (so 120 -> 120.0 and 1 -> true still count as changes)"""
+    return type(a) is type(b) and a == b
+
+
+def diff_json(old: Any, new: Any, path: str = '') -> List[Dict]:
+    """
+    Compute JSON Patch that turns `old` into `new`
+
+    Objects are compared key by key. Arrays of equal length are compared
+    item by item, otherwise the whole array is replaced.
+
+    Args:
+        old: Previous JSON value
+        new: New JSON value
+        path: JSON Pointer prefix for generated operations
+
+    Returns:
+        List of RFC 6902 operations
+
+    Example:
+        >>> diff_json({'total': 13}, {'total': 14})
+        [{'op': 'replace', 'path': '/total', 'value': 14}]
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key in old:
+            if key not in new:
+                ops.append({'op': 'remove', 'path': f"{path}/{escape_pointer_token(key)}"})
+        for key, value in new.items():
+            child_path = f"{path}/{escape_pointer_token(key)}"
+            if key not in old:
+                ops.append({'op': 'add', 'path': child_path, 'value': copy.deepcopy(value)})
+            else:
+                ops.extend(diff_json(old[key], value, child_path))
+        return ops
+
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        ops = []
+        for i, (old_item, new_item) in enumerate(zip(old, new)):
+            ops.extend(diff_json(old_item, new_item, f"{path}/{i}"))
+        return ops
+
+    if _same_value(old, new):
+        return []
+
+    return [{'op': 'replace', 'path': path, 'value': copy.deepcopy(new)}]
+
+
+def diff_calculated(old_calculated: Optional[Dict], new_calculated: Dict) -> List[Dict]:
+    """
+    Compute JSON Patch for the `calculated` section of a program
+
+    Paths are absolute within the program document (prefixed with /calculated).
+
+    Args:
+        old_calculated: Previous `calculated` section (None if never calculated)
+        new_calculated: Freshly computed `calculated` section
+
+    Returns:
+        List of RFC 6902 operations (empty if nothing changed)
+    """
+    if old_calculated is None:
+        return [{'op': 'add', 'path': '/calculated', 'value': copy.deepcopy(new_calculated)}]
+    return diff_json(old_calculated, new_calculated, '/calculated')
+
+
+def _resolve_parent(doc: Any, tokens: List[str], pointer: str):
+    """Walk to the container holding the last token"""
+    target = doc
+    for token in tokens[:-1]:
+        if isinstance(target, dict):
+            if token not in target:
+                raise ValueError(f"Path not found: {pointer}")
+            target = target[token]
+        elif isinstance(target, list):
+            target = target[_list_index(target, token, pointer)]
+        else:
+            raise ValueError(f"Path not found: {pointer}")
+    return target
+
+
+def _list_index(target: List, token: str, pointer: str, allow_end: bool = False) -> int:
+    """Parse array index token"""
+    if allow_end and token == '-':
+        return len(target)
+    if not token.isdigit():
+        raise ValueError(f"Invalid array index in path: {pointer}")
+    index = int(token)
+    limit = len(target) if allow_end else len(target) - 1
+    if index > limit:
+        raise ValueError(f"Array index out of range in path: {pointer}")
+    return index
+
+
+def apply_patch(doc: Any, patch: List[Dict]) -> Any:
+    """
+    Apply JSON Patch to a document in place
+
+    Intended for updating cached program copies with the output of
+    diff_calculated(). The root document itself can only be replaced,
+    in which case the new value is returned.
+
+    Args:
+        doc: JSON document (modified in place)
+        patch: List of RFC 6902 operations
+
+    Returns:
+        Patched document
+
+    Raises:
+        ValueError if an operation is invalid or a path does not exist
+
+    Example:
+        >>> program = {'calculated': {'squat': {'week_1': {'total_reps': 53}}}}
+        >>> apply_patch(program, [{'op': 'replace', 'path': '/calculated/squat/week_1/total_reps', 'value': 54}])
+        {'calculated': {'squat': {'week_1': {'total_reps': 54}}}}
+    """
+    for operation in patch:
+        op = operation.get('op')
+        pointer = operation.get('path')
+        if pointer is None:
+            raise ValueError(f"Patch operation without path: {operation}")
+
+        tokens = split_pointer(pointer)
+
+        if not tokens:
+            if op in ('add', 'replace'):
+                doc = copy.deepcopy(operation['value'])
+                continue
+            if op == 'test':
+                if not _same_value(doc, operation['value']):
+                    raise ValueError(f"Test failed at path: {pointer!r}")
+                continue
+            raise ValueError(f"Unsupported operation on document root: {op}")
+
+        parent = _resolve_parent(doc, tokens, pointer)
+        key = tokens[-1]
+
+        if isinstance(parent, dict):
+            if op == 'add':
+                parent[key] = copy.deepcopy(operation['value'])
+            elif op == 'replace':
+                if key not in parent:
+                    raise ValueError(f"Path not found: {pointer}")
+                parent[key] = copy.deepcopy(operation['value'])
+            elif op == 'remove':
+                if key not in parent:
+                    raise ValueError(f"Path not found: {pointer}")
+                del parent[key]
+            elif op == 'test':
+                if key not in parent or not _same_value(parent[key], operation['value']):
+                    raise ValueError(f"Test failed at path: {pointer}")
+            else:
+                raise ValueError(f"Unsupported patch operation: {op}")
+
+        elif isinstance(parent, list):
+            if op == 'add':
+                index = _list_index(parent, key, pointer, allow_end=True)
+                parent.insert(index, copy.deepcopy(operation['value']))
+            elif op == 'replace':
+                parent[_list_index(parent, key, pointer)] = copy.deepcopy(operation['value'])
+            elif op == 'remove':
+                del parent[_list_index(parent, key, pointer)]
+            elif op == 'test':
+                if not _same_value(parent[_list_index(parent, key, pointer)], operation['value']):
+                    raise ValueError(f"Test failed at path: {pointer}")
+            else:
+                raise ValueError(f"Unsupported patch operation: {op}")
+
+        else:
+            raise ValueError(f"Path not found: {pointer}")
+
+    return doc
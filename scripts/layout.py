@@ -0,0 +1,532 @@
+#!/usr/bin/env python3
+"""
+Client directory layout and manifest
+
+Two layouts of data/clients/ are supported:
+- flat:    clients/<slug>/profile.json, clients/<slug>/programs/*.json
+- sharded: clients/<hh>/<slug>/...  where hh = first 2 hex chars of sha1(slug)
+
+The client's directory is computed from its slug (the layout is read once
+per process), so finding it costs one stat. Listing clients and programs
+uses the manifest (data/.clients-manifest.json) instead of reading every
+directory: the manifest stores each directory's mtime, and only directories
+whose mtime changed (e.g. a program created by the web app) are read again.
+Roster tools take one client_index() per run and pass it around, so the
+manifest is refreshed once, not once per client. Writes done through
+storage.py that create a file update the manifest atomically.
+
+Without a manifest everything falls back to scanning the tree.
+
+The web app reads the flat layout only, so `shard` requires --scripts-only.
+
+Usage:
+    python layout.py status [data_dir]
+    python layout.py shard --scripts-only [data_dir]
+    python layout.py unshard [data_dir]
+    python layout.py rebuild-manifest [data_dir]
+"""
+
+import os
+import re
+import sys
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import json_codec
+
+
+DEFAULT_DATA_DIR = Path(__file__).parent.parent / 'data'
+
+# Kept next to clients/ (not inside), so manifest writes don't change its mtime
+MANIFEST_FILENAME = '.clients-manifest.json'
+MANIFEST_VERSION = 1
+
+LAYOUTS = ('flat', 'sharded')
+
+# Number of hex chars of sha1(slug) used as bucket name (2 = 256 buckets)
+SHARD_PREFIX_LENGTH = 2
+
+SHARD_PATTERN = re.compile(f'^[0-9a-f]{{{SHARD_PREFIX_LENGTH}}}$')
+
+
+def shard_for(slug: str) -> str:
+    """
+    Bucket name for a client slug
+
+    Example:
+        >>> shard_for('katerina-balasova')
+        'eb'
+    """
+    return hashlib.sha1(slug.encode('utf-8')).hexdigest()[:SHARD_PREFIX_LENGTH]
+
+
+def clients_root(data_dir) -> Path:
+    return Path(data_dir) / 'clients'
+
+
+def manifest_path(data_dir) -> Path:
+    return Path(data_dir) / MANIFEST_FILENAME
+
+
+def load_manifest(data_dir) -> Optional[Dict]:
+    """Load manifest, or None if the tree has none"""
+    try:
+        return json_codec.loads(manifest_path(data_dir).read_bytes())
+    except (FileNotFoundError, json_codec.JSONDecodeError):
+        return None
+
+
+_manifest_cache: Dict[str, Tuple[Tuple[int, int], Dict]] = {}
+
+
+def _load_manifest_cached(data_dir) -> Optional[Dict]:
+    """load_manifest(), parsed again only when the manifest file changed (one stat)"""
+    path = manifest_path(data_dir)
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _manifest_cache.get(str(path))
+    if cached is None or cached[0] != key:
+        manifest = load_manifest(data_dir)
+        if manifest is None:
+            return None
+        cached = (key, manifest)
+        _manifest_cache[str(path)] = cached
+    return cached[1]
+
+
+def save_manifest(data_dir, manifest: Dict):
+    """Write manifest atomically (compact JSON)"""
+    from storage import atomic_write_bytes
+    atomic_write_bytes(manifest_path(data_dir), json_codec.dumps(manifest, indent=None))
+
+
+def get_layout(data_dir) -> str:
+    """'sharded' if the manifest says so, otherwise 'flat'"""
+    manifest = load_manifest(data_dir)
+    return manifest.get('layout', 'flat') if manifest else 'flat'
+
+
+@lru_cache(maxsize=None)
+def _cached_layout(data_dir: str) -> str:
+    """get_layout() read once per process; client_dir() falls back if it's stale"""
+    return get_layout(data_dir)
+
+
+def _client_dir_for(data_dir, slug: str, layout: str) -> Path:
+    if layout == 'sharded':
+        return clients_root(data_dir) / shard_for(slug) / slug
+    return clients_root(data_dir) / slug
+
+
+def client_dir(data_dir, slug: str, layout: Optional[str] = None) -> Path:
+    """
+    Directory of a client (one stat; a second one only mid-conversion or
+    if the tree was converted since this process read its layout)
+
+    Returns the path for the current layout even if it doesn't exist yet,
+    so it can be used to create new clients.
+    """
+    layout = layout or _cached_layout(str(data_dir))
+    path = _client_dir_for(data_dir, slug, layout)
+    if path.is_dir():
+        return path
+
+    other = _client_dir_for(data_dir, slug, 'flat' if layout == 'sharded' else 'sharded')
+    return other if other.is_dir() else path
+
+
+def profile_path(data_dir, slug: str) -> Path:
+    return client_dir(data_dir, slug) / 'profile.json'
+
+
+def program_path(data_dir, slug: str, filename: str) -> Path:
+    return client_dir(data_dir, slug) / 'programs' / filename
+
+
+def _is_bucket(path: Path) -> bool:
+    """Shard bucket (directly in clients/) rather than a client dir"""
+    return (
+        SHARD_PATTERN.match(path.name) is not None
+        and not (path / 'profile.json').exists()
+        and not (path / 'programs').is_dir()
+    )
+
+
+def _mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _scan_container(container: Path, is_root: bool) -> Dict[str, Path]:
+    """
+    Client dirs directly inside a container (clients/ or a bucket): slug -> path
+
+    Every non-hidden dir counts as a client, even before its profile.json or
+    programs/ exists (the web app creates those in separate steps, and
+    creating them doesn't change the container's mtime).
+    """
+    found = {}
+    try:
+        entries = list(os.scandir(container))
+    except FileNotFoundError:
+        return found
+    for entry in entries:
+        if not entry.is_dir() or entry.name.startswith('.'):
+            continue
+        path = Path(entry.path)
+        if is_root and _is_bucket(path):
+            continue
+        found[entry.name] = path
+    return found
+
+
+def scan_client_dirs(data_dir) -> Dict[str, Path]:
+    """
+    Find all client dirs by reading the tree (either layout, or a mix of both)
+
+    Returns:
+        slug -> client dir
+    """
+    root = clients_root(data_dir)
+    found = _scan_container(root, is_root=True)
+    for bucket in _containers(data_dir, 'sharded')[1:] if root.is_dir() else []:
+        found.update(_scan_container(bucket, is_root=False))
+    return found
+
+
+def _list_programs(programs_dir: Path) -> List[str]:
+    try:
+        return sorted(
+            entry.name for entry in os.scandir(programs_dir)
+            if entry.is_file() and entry.name.endswith('.json') and not entry.name.startswith('.')
+        )
+    except FileNotFoundError:
+        return []
+
+
+def _client_entry(data_dir, slug: str, path: Path) -> Dict:
+    programs_dir = path / 'programs'
+    return {
+        'dir': path.relative_to(clients_root(data_dir)).as_posix(),
+        'programs_mtime_ns': _mtime_ns(programs_dir),
+        'programs': _list_programs(programs_dir),
+    }
+
+
+def _containers(data_dir, layout: str) -> List[Path]:
+    """Directories that hold client dirs"""
+    root = clients_root(data_dir)
+    if layout == 'flat':
+        return [root]
+    return [root] + sorted(p for p in root.iterdir() if p.is_dir() and _is_bucket(p))
+
+
+def build_manifest(data_dir, layout: Optional[str] = None) -> Dict:
+    """Build manifest by scanning the whole tree"""
+    layout = layout or get_layout(data_dir)
+    root = clients_root(data_dir)
+    return {
+        'version': MANIFEST_VERSION,
+        'layout': layout,
+        'containers': {
+            p.relative_to(root).as_posix(): _mtime_ns(p) for p in _containers(data_dir, layout)
+        },
+        'clients': {
+            slug: _client_entry(data_dir, slug, path)
+            for slug, path in sorted(scan_client_dirs(data_dir).items())
+        },
+    }
+
+
+def rebuild_manifest(data_dir, layout: Optional[str] = None) -> Dict:
+    """Rebuild and save manifest from a full scan"""
+    from storage import file_lock
+    with file_lock(manifest_path(data_dir)):
+        manifest = build_manifest(data_dir, layout)
+        save_manifest(data_dir, manifest)
+    return manifest
+
+
+def refresh_manifest(data_dir, clients: Optional[List[str]] = None) -> Optional[Dict]:
+    """
+    Bring manifest up to date with one stat per directory
+
+    Only containers/program dirs whose mtime changed are read again.
+    Saves the manifest if anything changed.
+
+    Args:
+        data_dir: Data root
+        clients: Only check program dirs of these clients (default: all)
+
+    Returns:
+        Fresh manifest, or None if the tree has no manifest
+    """
+    manifest = load_manifest(data_dir)
+    if manifest is None:
+        return None
+
+    root = clients_root(data_dir)
+    changed = False
+
+    containers = manifest['containers']
+    pending = sorted(containers)
+    while pending:
+        container = pending.pop(0)
+        current = _mtime_ns(root / container)
+        if current == containers[container]:
+            continue
+        changed = True
+        containers[container] = current
+
+        # New buckets show up as a change of clients/ itself
+        if container == '.' and manifest['layout'] == 'sharded':
+            for bucket in _containers(data_dir, 'sharded')[1:]:
+                if bucket.name not in containers:
+                    containers[bucket.name] = None
+                    pending.append(bucket.name)
+
+        found = _scan_container(root / container, is_root=container == '.')
+        for slug, entry in list(manifest['clients'].items()):
+            if Path(entry['dir']).parent.as_posix() == container and slug not in found:
+                del manifest['clients'][slug]
+        for slug, path in found.items():
+            if slug not in manifest['clients']:
+                manifest['clients'][slug] = _client_entry(data_dir, slug, path)
+
+    for slug, entry in manifest['clients'].items():
+        if clients is not None and slug not in clients:
+            continue
+        programs_dir = root / entry['dir'] / 'programs'
+        current = _mtime_ns(programs_dir)
+        if current != entry['programs_mtime_ns']:
+            changed = True
+            entry['programs_mtime_ns'] = current
+            entry['programs'] = _list_programs(programs_dir)
+
+    if changed:
+        from storage import file_lock
+        with file_lock(manifest_path(data_dir)):
+            save_manifest(data_dir, manifest)
+
+    return manifest
+
+
+# slug -> (client dir, program files sorted by name)
+ClientIndex = Dict[str, Tuple[Path, List[Path]]]
+
+
+def client_index(data_dir, clients: Optional[List[str]] = None) -> ClientIndex:
+    """
+    All clients and their program files, with one manifest refresh
+
+    Without a manifest the tree is scanned once. Build it once per run and
+    pass it to iter_client_dirs() / iter_program_files().
+
+    Args:
+        data_dir: Data root
+        clients: Only these client slugs (without a manifest, only their
+                 dirs are read)
+    """
+    manifest = refresh_manifest(data_dir, clients)
+
+    if manifest is None:
+        if clients is None:
+            dirs = scan_client_dirs(data_dir)
+        else:
+            dirs = {slug: client_dir(data_dir, slug) for slug in clients}
+        return {
+            slug: (path, sorted((path / 'programs').glob('*.json')))
+            for slug, path in sorted(dirs.items())
+            if path.is_dir()
+        }
+
+    root = clients_root(data_dir)
+    index = {}
+    for slug in sorted(manifest['clients']) if clients is None else sorted(clients):
+        entry = manifest['clients'].get(slug)
+        if entry is not None:
+            path = root / entry['dir']
+            index[slug] = (path, [path / 'programs' / filename for filename in entry['programs']])
+    return index
+
+
+def iter_client_dirs(data_dir, index: Optional[ClientIndex] = None) -> Iterator[Path]:
+    """Yield client dirs sorted by slug (from `index`, or a fresh client_index())"""
+    if index is None:
+        index = client_index(data_dir)
+    for slug in sorted(index):
+        yield index[slug][0]
+
+
+def iter_program_files(
+    data_dir,
+    clients: Optional[List[str]] = None,
+    index: Optional[ClientIndex] = None
+) -> Iterator[Path]:
+    """
+    Yield program files sorted by (client, filename)
+
+    Args:
+        data_dir: Data root
+        clients: Only these client slugs (default: all), in this order
+        index: client_index() of this run (default: build one)
+    """
+    if index is None:
+        index = client_index(data_dir, clients)
+    for slug in sorted(index) if clients is None else clients:
+        if slug in index:
+            yield from index[slug][1]
+
+
+def _owning_client(filepath: Path) -> Optional[Tuple[Path, Path]]:
+    """(data_dir, client_dir) of a profile/program file, None for other files"""
+    if filepath.name == MANIFEST_FILENAME or filepath.name.startswith('.'):
+        return None
+
+    if filepath.parent.name == 'programs':
+        cdir = filepath.parent.parent
+    elif filepath.name == 'profile.json':
+        cdir = filepath.parent
+    else:
+        return None
+
+    root = next((p for p in cdir.parents if p.name == 'clients'), None)
+    if root is None:
+        return None
+    return root.parent, cdir
+
+
+def is_client_file(filepath) -> bool:
+    """
+    Is this a client's profile or program (not e.g. a data/temp/ scratch file)?
+
+    Example:
+        >>> is_client_file('data/clients/katerina-balasova/programs/2025-01-20_prep_squat.json')
+        True
+        >>> is_client_file('data/temp/temp_1737370000000.json')
+        False
+    """
+    return _owning_client(Path(filepath).resolve()) is not None
+
+
+def record_write(filepath):
+    """
+    Update manifest after a client file was written (called by storage.py)
+
+    Only creates touch the manifest: overwriting a file the manifest already
+    lists takes no lock and writes nothing (refresh_manifest() picks up the
+    new directory mtime later). No-op for files outside clients/ and for
+    trees without a manifest.
+    """
+    filepath = Path(filepath).resolve()
+    owner = _owning_client(filepath)
+    if owner is None:
+        return
+
+    data_dir, cdir = owner
+    if not manifest_path(data_dir).exists():
+        return
+
+    entry = (_load_manifest_cached(data_dir) or {}).get('clients', {}).get(cdir.name)
+    if entry is not None and (filepath.name == 'profile.json' or filepath.name in entry['programs']):
+        return
+
+    from storage import file_lock
+    with file_lock(manifest_path(data_dir)):
+        manifest = load_manifest(data_dir)
+        if manifest is None:
+            return
+        # Containers are left to refresh_manifest(): marking them seen here
+        # could hide a client created concurrently by the web app
+        manifest['clients'][cdir.name] = _client_entry(data_dir, cdir.name, cdir)
+        save_manifest(data_dir, manifest)
+
+
+def convert_layout(data_dir, target: str) -> int:
+    """
+    Move all client dirs to the target layout and rebuild the manifest
+
+    Each client dir is moved with a single rename. An interrupted run leaves
+    a mixed tree that client_dir() still resolves; running again finishes it.
+
+    Returns:
+        Number of moved client dirs
+    """
+    if target not in LAYOUTS:
+        raise ValueError(f"Unknown layout: {target} (expected one of {LAYOUTS})")
+
+    root = clients_root(data_dir)
+    moved = 0
+    for slug, path in scan_client_dirs(data_dir).items():
+        dest = _client_dir_for(data_dir, slug, target)
+        if path == dest:
+            continue
+        if dest.exists():
+            raise FileExistsError(f"Cannot move {path}: {dest} already exists")
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        os.rename(path, dest)
+        moved += 1
+
+    if target == 'flat':
+        for bucket in root.iterdir():
+            if bucket.is_dir() and SHARD_PATTERN.match(bucket.name) and not any(bucket.iterdir()):
+                bucket.rmdir()
+
+    rebuild_manifest(data_dir, target)
+    _cached_layout.cache_clear()
+    return moved
+
+
+def main():
+    args = sys.argv[1:]
+    scripts_only = '--scripts-only' in args
+    if scripts_only:
+        args.remove('--scripts-only')
+
+    commands = ('status', 'shard', 'unshard', 'rebuild-manifest')
+    if not args or args[0] not in commands:
+        print("Usage: python layout.py {status|shard|unshard|rebuild-manifest} [--scripts-only] [data_dir]")
+        sys.exit(1)
+
+    command = args[0]
+    data_dir = Path(args[1]) if len(args) > 1 else DEFAULT_DATA_DIR
+    if not clients_root(data_dir).is_dir():
+        print(f"❌ Error: No clients/ directory in {data_dir}")
+        sys.exit(1)
+
+    if command == 'status':
+        manifest = refresh_manifest(data_dir)
+        print(f"📁 Layout: {get_layout(data_dir)}")
+        if manifest is None:
+            print("   Manifest: none (listing scans the tree)")
+        else:
+            programs = sum(len(c['programs']) for c in manifest['clients'].values())
+            print(f"   Manifest: {len(manifest['clients'])} clients, {programs} programs")
+        return
+
+    if command == 'rebuild-manifest':
+        manifest = rebuild_manifest(data_dir)
+        print(f"✅ Manifest rebuilt: {len(manifest['clients'])} clients ({manifest['layout']})")
+        return
+
+    if command == 'shard':
+        print("⚠️  The web app reads the flat layout only: after sharding, its client and")
+        print("   program pages and API routes can't find any data.")
+        if not scripts_only:
+            print("❌ Refusing to shard without --scripts-only (use it only for trees not served by the web app)")
+            sys.exit(1)
+
+    target = 'sharded' if command == 'shard' else 'flat'
+    moved = convert_layout(data_dir, target)
+    print(f"✅ Converted to {target} layout ({moved} clients moved), manifest rebuilt")
+
+
+if __name__ == '__main__':
+    main()
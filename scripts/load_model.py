@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Fitness-fatigue (Banister) load model from calculated programs
+
+1. Daily load: every session in calculated[lift][week_N]['sessions'] is placed
+   on its calendar date and converted to
+   - tonnage: sum(reps × zone weight) in kg (weights from lift `_summary`)
+   - intensity_reps: sum(reps × zone intensity / 100)
+   Only active/completed programs count (drafts optionally). A client's
+   programs are chained by start_date; a program that starts while an
+   earlier one is still running replaces it from that day.
+2. Banister model on the daily load:
+       fitness[t]     = sum_i load[t - i] * exp(-i / FITNESS_TAU)
+       fatigue[t]     = sum_i load[t - i] * exp(-i / FATIGUE_TAU)
+       performance[t] = K_FITNESS * fitness[t] - K_FATIGUE * fatigue[t]
+   computed for all clients at once as an FFT convolution (numpy).
+
+Usage:
+    python load_model.py [data_dir] [--load intensity_reps|tonnage] [--until YYYY-MM-DD] [--include-drafts] [-o series.csv]
+"""
+
+import csv
+import argparse
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+import json_codec
+from layout import ClientIndex, client_index, iter_program_files
+from constants import DAYS_OF_WEEK, DEFAULT_TRAINING_DAYS
+from utilities import zone_intensity
+
+
+DEFAULT_DATA_DIR = Path(__file__).parent.parent / 'data'
+
+# Banister model defaults (days / gains)
+FITNESS_TAU = 42
+FATIGUE_TAU = 7
+K_FITNESS = 1.0
+K_FATIGUE = 2.0
+
+LOAD_TYPES = ('intensity_reps', 'tonnage')
+
+# Programs that were (or are being) trained; drafts are alternatives
+TRAINED_STATUSES = ('active', 'completed')
+
+
+def session_offset(day_key: str, position: int, n_sessions: int, start_weekday: int) -> int:
+    """
+    Days from week start to a session
+
+    Weekday keys are placed on that weekday; letter keys ('A', 'B', ...) from
+    older programs use the default training days for the session count.
+    """
+    day_key = day_key.lower()
+    if day_key not in DAYS_OF_WEEK:
+        default_days = DEFAULT_TRAINING_DAYS.get(n_sessions, DAYS_OF_WEEK)
+        day_key = default_days[min(position, len(default_days) - 1)]
+    return (DAYS_OF_WEEK.index(day_key) - start_weekday) % 7
+
+
+def iter_program_sessions(program: Dict) -> Iterator[Tuple[date, float, float]]:
+    """
+    Yield (date, tonnage, intensity_reps) for every calculated session of a program
+    """
+    start = date.fromisoformat(program['program_info']['start_date'])
+    start_weekday = start.weekday()
+
+    for targets in program.get('calculated', {}).values():
+        weights = targets.get('_summary', {}).get('weights', {})
+        for week_key, week in targets.items():
+            if not week_key.startswith('week_'):
+                continue
+            week_start = start + timedelta(days=7 * (int(week_key.split('_', 1)[1]) - 1))
+            sessions = week.get('sessions', {})
+
+            for position, (day_key, session) in enumerate(sessions.items()):
+                zones = session.get('zones', {})
+                intensity_reps = sum(reps * zone_intensity(zone) / 100 for zone, reps in zones.items() if reps)
+
+                # Programs calculated with load metrics already carry tonnage
+                tonnage = session.get('tonnage')
+                if tonnage is None:
+                    tonnage = sum(reps * (weights.get(zone) or 0) for zone, reps in zones.items() if reps)
+
+                if tonnage or intensity_reps:
+                    offset = session_offset(day_key, position, len(sessions), start_weekday)
+                    yield week_start + timedelta(days=offset), tonnage, intensity_reps
+
+
+def load_client_programs(
+    data_dir: Path,
+    client: str,
+    include_drafts: bool = False,
+    index: Optional[ClientIndex] = None
+) -> List[Dict]:
+    """Load client's calculated active/completed programs (and drafts if asked) sorted by start_date"""
+    statuses = TRAINED_STATUSES + (('draft',) if include_drafts else ())
+    programs = []
+    for path in iter_program_files(data_dir, [client], index):
+        program = json_codec.loads(path.read_bytes())
+        if program.get('meta', {}).get('status') not in statuses:
+            continue
+        if program.get('calculated') and program.get('program_info', {}).get('start_date'):
+            programs.append(program)
+    return sorted(programs, key=lambda p: p['program_info']['start_date'])
+
+
+def daily_load_series(programs: List[Dict], until: Optional[date] = None):
+    """
+    Build daily load arrays for one client
+
+    Args:
+        programs: Calculated programs sorted by start_date
+        until: Extend series (with zero load) up to this date
+
+    Returns:
+        Tuple of (first_date, tonnage, intensity_reps), or None if no sessions
+    """
+    dates, tonnage, intensity_reps = [], [], []
+
+    for i, program in enumerate(programs):
+        next_start = None
+        if i + 1 < len(programs):
+            next_start = date.fromisoformat(programs[i + 1]['program_info']['start_date'])
+
+        for day, ton, irw in iter_program_sessions(program):
+            if next_start is not None and day >= next_start:
+                continue
+            dates.append(day.toordinal())
+            tonnage.append(ton)
+            intensity_reps.append(irw)
+
+    if not dates:
+        return None
+
+    day_index = np.asarray(dates, dtype=np.int64)
+    first = int(day_index.min())
+    last = max(int(day_index.max()), until.toordinal() if until else 0)
+    day_index -= first
+
+    tonnage_series = np.zeros(last - first + 1)
+    intensity_series = np.zeros(last - first + 1)
+    np.add.at(tonnage_series, day_index, tonnage)
+    np.add.at(intensity_series, day_index, intensity_reps)
+
+    return date.fromordinal(first), tonnage_series, intensity_series
+
+
+def exponential_response(loads: np.ndarray, tau: float) -> np.ndarray:
+    """
+    Causal exponential convolution of each row: out[t] = sum_i load[t-i] * exp(-i/tau)
+
+    All rows (clients) are convolved in one FFT pass.
+
+    Args:
+        loads: 2D array (clients × days); rows shorter than the longest must be zero-padded at the end
+        tau: Decay time constant in days
+    """
+    n_days = loads.shape[1]
+    size = 1 << (2 * n_days - 1).bit_length()
+    kernel = np.exp(-np.arange(n_days) / tau)
+
+    spectrum = np.fft.rfft(loads, size, axis=1) * np.fft.rfft(kernel, size)
+    return np.fft.irfft(spectrum, size, axis=1)[:, :n_days]
+
+
+def banister(
+    loads: np.ndarray,
+    fitness_tau: float = FITNESS_TAU,
+    fatigue_tau: float = FATIGUE_TAU,
+    k_fitness: float = K_FITNESS,
+    k_fatigue: float = K_FATIGUE
+):
+    """
+    Banister fitness-fatigue model for a batch of daily load series
+
+    Returns:
+        Tuple of 2D arrays (fitness, fatigue, performance)
+    """
+    fitness = exponential_response(loads, fitness_tau)
+    fatigue = exponential_response(loads, fatigue_tau)
+    return fitness, fatigue, k_fitness * fitness - k_fatigue * fatigue
+
+
+def roster_load_model(
+    data_dir: Path = DEFAULT_DATA_DIR,
+    load_type: str = 'intensity_reps',
+    until: Optional[date] = None,
+    clients: Optional[List[str]] = None,
+    include_drafts: bool = False
+) -> Dict[str, Dict]:
+    """
+    Daily load and fitness-fatigue series for every client
+
+    Args:
+        data_dir: Data root
+        load_type: Load fed into the model ('intensity_reps' or 'tonnage')
+        until: Extend all series to this date
+        clients: Only these client slugs
+        include_drafts: Also use draft programs (by default only active/completed)
+
+    Returns:
+        slug -> {'start_date', 'tonnage', 'intensity_reps',
+                 'fitness', 'fatigue', 'performance'} (numpy arrays, one value per day)
+    """
+    if load_type not in LOAD_TYPES:
+        raise ValueError(f"Unknown load type: {load_type} (expected one of {LOAD_TYPES})")
+
+    index = client_index(data_dir)
+    slugs = sorted(index)
+    if clients:
+        slugs = [slug for slug in slugs if slug in clients]
+
+    series = {}
+    for slug in slugs:
+        result = daily_load_series(load_client_programs(data_dir, slug, include_drafts, index), until)
+        if result is not None:
+            start, tonnage, intensity_reps = result
+            series[slug] = {
+                'start_date': start,
+                'tonnage': tonnage,
+                'intensity_reps': intensity_reps,
+            }
+
+    if not series:
+        return {}
+
+    n_days = max(len(s['tonnage']) for s in series.values())
+    batch = np.zeros((len(series), n_days))
+    for row, s in enumerate(series.values()):
+        batch[row, :len(s[load_type])] = s[load_type]
+
+    fitness, fatigue, performance = banister(batch)
+
+    for row, s in enumerate(series.values()):
+        length = len(s['tonnage'])
+        s['fitness'] = fitness[row, :length]
+        s['fatigue'] = fatigue[row, :length]
+        s['performance'] = performance[row, :length]
+
+    return series
+
+
+def write_series_csv(filepath: str, series: Dict[str, Dict]):
+    """Write one row per (client, day)"""
+    columns = ['tonnage', 'intensity_reps', 'fitness', 'fatigue', 'performance']
+    with open(filepath, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['client', 'date'] + columns)
+        for client, s in series.items():
+            for i in range(len(s['tonnage'])):
+                day = s['start_date'] + timedelta(days=i)
+                writer.writerow([client, day.isoformat()] + [round(float(s[c][i]), 2) for c in columns])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fitness-fatigue load model for the roster')
+    parser.add_argument('data_dir', nargs='?', default=str(DEFAULT_DATA_DIR))
+    parser.add_argument('--load', choices=LOAD_TYPES, default='intensity_reps', help='Load fed into the model')
+    parser.add_argument('--until', help='Extend series to YYYY-MM-DD (e.g. today)')
+    parser.add_argument('--client', action='append', help='Client slug (repeatable)')
+    parser.add_argument('--include-drafts', action='store_true', help='Also use draft programs (planned, not trained)')
+    parser.add_argument('-o', '--output', help='Write daily series CSV')
+    args = parser.parse_args()
+
+    until = date.fromisoformat(args.until) if args.until else None
+    series = roster_load_model(Path(args.data_dir), args.load, until, args.client, args.include_drafts)
+
+    print(f"📈 Fitness-fatigue model ({args.load}, τ fitness={FITNESS_TAU}d, τ fatigue={FATIGUE_TAU}d)\n")
+    if not series:
+        print("   No calculated active/completed programs" + ("" if args.include_drafts else " (drafts need --include-drafts)"))
+    for client, s in series.items():
+        last_day = s['start_date'] + timedelta(days=len(s['tonnage']) - 1)
+        print(f"   {client} ({s['start_date']} → {last_day})")
+        print(f"     Total tonnage: {s['tonnage'].sum():.0f} kg")
+        print(f"     Fitness: {s['fitness'][-1]:.1f}  Fatigue: {s['fatigue'][-1]:.1f}  "
+              f"Performance: {s['performance'][-1]:.1f}")
+
+    if args.output:
+        write_series_csv(args.output, series)
+        print(f"\n✅ Saved: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Bulk schema migration for program and profile files
+
+Each upgrade step converts one schema version to the next and is registered
+with the @migration decorator:
+
+    @migration('program', '1.0', '1.1')
+    def program_1_0_to_1_1(data):
+        data['program_info']['block'] = data['program_info'].pop('phase')
+        return data
+
+Every file gets a single read → upgrade (all steps in a row) → validate
+(against schemas/v{version}/) → atomic compare-and-swap write pass.
+Files are processed in parallel by a process pool. Finished files are
+appended to a progress log, so an interrupted run continues where it
+stopped.
+
+Usage:
+    python migrate.py [data_dir] [--dry-run] [--workers N] [--no-validate] [--restart]
+"""
+
+import os
+import sys
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from jsonschema import Draft7Validator
+
+import json_codec
+from layout import client_index, iter_client_dirs, iter_program_files
+from storage import read_json_versioned, save_if_unchanged, ConcurrentModificationError, LockTimeoutError
+
+
+DEFAULT_DATA_DIR = Path(__file__).parent.parent / 'data'
+SCHEMAS_DIR = Path(__file__).parent.parent / 'schemas'
+
+# Progress log (one finished file path per line, relative to data_dir and
+# '/'-separated, so the tree can be moved between runs). The first line identifies the migration set the log belongs to.
+PROGRESS_FILENAME = '.migration-progress'
+PROGRESS_HEADER_PREFIX = '# migrations '
+
+# Files with this marker have no schema_version
+UNVERSIONED = None
+
+# (schema_type, from_version) -> (to_version, step)
+MIGRATIONS: Dict[Tuple[str, Optional[str]], Tuple[str, Callable[[Dict], Dict]]] = {}
+
+
+def migration(schema_type: str, from_version: Optional[str], to_version: str):
+    """Register upgrade step from_version -> to_version for 'program' or 'profile'"""
+    def register(step: Callable[[Dict], Dict]) -> Callable[[Dict], Dict]:
+        key = (schema_type, from_version)
+        if key in MIGRATIONS:
+            raise ValueError(f"Duplicate migration for {schema_type} {from_version}")
+        MIGRATIONS[key] = (to_version, step)
+        return step
+    return register
+
+
+# ============================================================
+# Upgrade steps
+# ============================================================
+
+@migration('program', UNVERSIONED, '1.0')
+def program_unversioned_to_1_0(data: Dict) -> Dict:
+    """Files written before versioning are 1.0 content without the marker"""
+    return {'schema_version': '1.0', **data}
+
+
+@migration('profile', UNVERSIONED, '1.0')
+def profile_unversioned_to_1_0(data: Dict) -> Dict:
+    """Files written before versioning are 1.0 content without the marker"""
+    return {'schema_version': '1.0', **data}
+
+
+# ============================================================
+# Runner
+# ============================================================
+
+def detect_schema_type(path: Path, data) -> Optional[str]:
+    """'profile', 'program' or None for other files (users.json, ...)"""
+    if not isinstance(data, dict):
+        return None
+    if path.name == 'profile.json':
+        return 'profile'
+    if 'program_info' in data:
+        return 'program'
+    return None
+
+
+def upgrade(schema_type: str, data: Dict) -> Tuple[Dict, List[str]]:
+    """
+    Apply all upgrade steps from the file's version to the latest
+
+    Returns:
+        Tuple of (upgraded data, list of versions passed through)
+    """
+    versions = []
+    version = data.get('schema_version', UNVERSIONED)
+    while (schema_type, version) in MIGRATIONS:
+        version, step = MIGRATIONS[(schema_type, version)]
+        data = step(data)
+        data['schema_version'] = version
+        versions.append(version)
+    return data, versions
+
+
+@lru_cache(maxsize=None)
+def get_validator(schema_type: str, version: str) -> Draft7Validator:
+    """Validator for schemas/v{version}/{schema_type}.schema.json (cached per worker)"""
+    schema_path = SCHEMAS_DIR / f'v{version}' / f'{schema_type}.schema.json'
+    return Draft7Validator(json_codec.loads(schema_path.read_bytes()))
+
+
+def migrate_file(path_str: str, dry_run: bool = False, validate: bool = True) -> Dict:
+    """
+    Migrate one file (runs in a worker process)
+
+    Returns:
+        Result dict with 'path', 'status' and details. Status is one of
+        unchanged, skipped, migrated, would_migrate, invalid, conflict, error
+    """
+    path = Path(path_str)
+    result = {'path': path_str, 'status': 'unchanged'}
+
+    try:
+        data, version = read_json_versioned(path)
+        schema_type = detect_schema_type(path, data)
+        if schema_type is None:
+            result['status'] = 'skipped'
+            return result
+
+        from_version = data.get('schema_version')
+        data, versions = upgrade(schema_type, data)
+        if not versions:
+            return result
+
+        result.update({'from': from_version, 'to': versions[-1]})
+
+        if validate:
+            errors = list(get_validator(schema_type, versions[-1]).iter_errors(data))
+            if errors:
+                result['status'] = 'invalid'
+                result['errors'] = [
+                    f"{'/'.join(str(p) for p in e.path) or '(root)'}: {e.message}"
+                    for e in errors[:5]
+                ]
+                return result
+
+        if dry_run:
+            result['status'] = 'would_migrate'
+            return result
+
+        save_if_unchanged(path, data, version)
+        result['status'] = 'migrated'
+
+    except (ConcurrentModificationError, LockTimeoutError) as e:
+        result.update({'status': 'conflict', 'errors': [str(e)]})
+    except Exception as e:
+        result.update({'status': 'error', 'errors': [f"{type(e).__name__}: {e}"]})
+
+    return result
+
+
+def iter_data_files(data_dir: Path) -> Iterator[Path]:
+    """Yield profiles and programs of all clients"""
+    index = client_index(data_dir)
+    for client_dir in iter_client_dirs(data_dir, index):
+        profile = client_dir / 'profile.json'
+        if profile.exists():
+            yield profile
+        yield from iter_program_files(data_dir, [client_dir.name], index)
+
+
+def migrations_signature() -> str:
+    """Hash of all registered upgrade steps (changes when a step is added)"""
+    steps = sorted(
+        f"{schema_type}:{from_version}->{to_version}"
+        for (schema_type, from_version), (to_version, _) in MIGRATIONS.items()
+    )
+    return hashlib.sha256('\n'.join(steps).encode('utf-8')).hexdigest()[:16]
+
+
+def progress_entry(path, data_dir) -> str:
+    """
+    Progress log line for a data file
+
+    Example:
+        >>> progress_entry('data/clients/katerina-balasova/profile.json', 'data')
+        'clients/katerina-balasova/profile.json'
+    """
+    return Path(path).relative_to(data_dir).as_posix()
+
+
+def load_progress(progress_path: Path, signature: str) -> Optional[set]:
+    """
+    Paths finished by a previous (interrupted) run
+
+    Returns:
+        Set of progress_entry() paths, or None if there is no log or it was written for a
+        different set of migrations (files it lists may need the new steps)
+    """
+    try:
+        with open(progress_path, 'r', encoding='utf-8') as f:
+            if f.readline().rstrip('\n') != PROGRESS_HEADER_PREFIX + signature:
+                return None
+            return {line.rstrip('\n') for line in f if line.strip()}
+    except FileNotFoundError:
+        return None
+
+
+def run_migration(
+    data_dir: Path = DEFAULT_DATA_DIR,
+    dry_run: bool = False,
+    workers: Optional[int] = None,
+    validate: bool = True,
+    restart: bool = False
+) -> Dict[str, int]:
+    """
+    Migrate the whole data tree
+
+    Args:
+        data_dir: Data root
+        dry_run: Report only, write nothing (and don't record progress)
+        workers: Process pool size (default: CPU count)
+        validate: Validate upgraded data against the target schema before writing
+        restart: Ignore progress of a previous run
+
+    Returns:
+        Count of files per status
+    """
+    progress_path = Path(data_dir) / PROGRESS_FILENAME
+    signature = migrations_signature()
+    done = None if restart else load_progress(progress_path, signature)
+    resume = done is not None
+    done = done or set()
+    files = [str(p) for p in iter_data_files(data_dir) if progress_entry(p, data_dir) not in done]
+
+    counts = {'resumed': len(done)} if done else {}
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(files) // (workers * 4))
+
+    progress = None
+    if not dry_run:
+        # Stale or missing log: start a new one for this migration set
+        progress = open(progress_path, 'a' if resume else 'w', encoding='utf-8')
+        if not resume:
+            progress.write(PROGRESS_HEADER_PREFIX + signature + '\n')
+            progress.flush()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for result in pool.map(migrate_file, files, [dry_run] * len(files),
+                                   [validate] * len(files), chunksize=chunksize):
+                status = result['status']
+                counts[status] = counts.get(status, 0) + 1
+
+                if status not in ('unchanged', 'skipped'):
+                    arrow = f" ({result.get('from')} → {result.get('to')})" if 'to' in result else ''
+                    print(f"   {status:<14} {Path(result['path']).relative_to(data_dir)}{arrow}")
+                    for error in result.get('errors', []):
+                        print(f"                  {error}")
+
+                # Failed files are retried on the next run
+                if progress and status in ('unchanged', 'skipped', 'migrated'):
+                    progress.write(progress_entry(result['path'], data_dir) + '\n')
+                    progress.flush()
+    finally:
+        if progress:
+            progress.close()
+
+    if not dry_run and not any(counts.get(s) for s in ('invalid', 'conflict', 'error')):
+        progress_path.unlink(missing_ok=True)
+
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Migrate program/profile files to the latest schema version')
+    parser.add_argument('data_dir', nargs='?', default=str(DEFAULT_DATA_DIR))
+    parser.add_argument('--dry-run', action='store_true', help='Only report what would change')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: CPU count)')
+    parser.add_argument('--no-validate', action='store_true', help='Write even if the target schema rejects the file')
+    parser.add_argument('--restart', action='store_true', help='Ignore progress of an interrupted run')
+    args = parser.parse_args()
+
+    data_dir = Path(args.data_dir).resolve()
+    if not (data_dir / 'clients').is_dir():
+        print(f"❌ Error: No clients/ directory in {data_dir}")
+        sys.exit(1)
+
+    print(f"🔄 Migrating: {data_dir}{' (dry run)' if args.dry_run else ''}\n")
+    counts = run_migration(data_dir, args.dry_run, args.workers, not args.no_validate, args.restart)
+
+    print()
+    for status, count in sorted(counts.items()):
+        print(f"   {status}: {count}")
+
+    if any(counts.get(s) for s in ('invalid', 'conflict', 'error')):
+        print("\n⚠️  Some files were not migrated; fix them and run again to continue")
+        sys.exit(1)
+
+    print("\n✅ Migration complete")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Retarget weights of a client's programs after a new 1RM entry
+
+For every draft/active program of the client:
+- client.one_rm gets the latest 1RM from profile one_rm_history
+- input[lift].weights and calculated[lift]._summary.weights are recomputed
+  (calculate_program_weights with the lift's rounding)
+- weight-dependent fields follow: tonnage of sessions/weeks/block, and
+  set weights (from set percentage) in generated `sessions`
+
+Rep apportionment (weekly/zone/session reps) is not touched, so programs
+are not recalculated. All changed files are written in one batch: if any
+of them changed since it was read, none is written.
+
+Usage: python retarget.py <client-slug> [--dry-run] [--data-dir DIR]
+"""
+
+import sys
+import argparse
+from pathlib import Path
+from typing import Dict, List
+
+import json_codec
+from constants import DEFAULT_ROUNDING, LIFTS
+from utilities import get_current_1rm, calculate_program_weights, calculate_load_metrics, calculate_weight
+from layout import profile_path, iter_program_files
+from storage import (
+    read_json_versioned,
+    save_all_if_unchanged,
+    ConcurrentModificationError,
+    LockTimeoutError,
+)
+
+
+DEFAULT_DATA_DIR = Path(__file__).parent.parent / 'data'
+
+# Program statuses that get retargeted
+RETARGET_STATUSES = ('draft', 'active')
+
+
+def latest_one_rms(profile: Dict) -> Dict[str, float]:
+    """Latest 1RM per lift from profile history (lifts without history left out)"""
+    one_rms = {}
+    for lift in LIFTS:
+        try:
+            one_rms[lift] = get_current_1rm(profile, lift)[0]
+        except ValueError:
+            continue
+    return one_rms
+
+
+def retarget_calculated(lift_targets: Dict, weights: Dict[str, float]):
+    """Update weights and tonnage of one lift's calculated targets in place"""
+    for key, week in lift_targets.items():
+        if key == '_summary':
+            week['weights'] = dict(weights)
+            if 'tonnage' in week:
+                week['tonnage'] = calculate_load_metrics(week.get('zone_totals', {}), weights)['tonnage']
+            continue
+
+        if 'tonnage' in week:
+            week['tonnage'] = calculate_load_metrics(week.get('zones', {}), weights)['tonnage']
+        for session in week.get('sessions', {}).values():
+            if 'tonnage' in session:
+                session['tonnage'] = calculate_load_metrics(session.get('zones', {}), weights)['tonnage']
+
+
+def retarget_generated_sessions(sessions: Dict, one_rms: Dict[str, float], roundings: Dict[str, float]):
+    """Recompute set weights from set percentage in generated `sessions` (in place)"""
+    for day in sessions.values():
+        for week in day.values():
+            if not isinstance(week, dict):
+                continue
+            for lift_entry in week.get('lifts', []):
+                lift = lift_entry.get('lift')
+                if lift not in one_rms:
+                    continue
+                for s in lift_entry.get('sets', []):
+                    if s.get('percentage') is not None:
+                        s['weight'] = calculate_weight(
+                            one_rms[lift], s['percentage'], roundings.get(lift, DEFAULT_ROUNDING)
+                        )
+
+
+def retarget_program(program: Dict, one_rms: Dict[str, float]) -> List[str]:
+    """
+    Retarget one program in place
+
+    Returns:
+        Lifts whose 1RM changed (empty = program unchanged)
+    """
+    client_one_rm = program.setdefault('client', {}).setdefault('one_rm', {})
+    changed = [
+        lift for lift in client_one_rm
+        if lift in one_rms and client_one_rm[lift] != one_rms[lift]
+    ]
+    if not changed:
+        return []
+
+    roundings = {}
+    for lift in changed:
+        client_one_rm[lift] = one_rms[lift]
+
+        lift_input = program.get('input', {}).get(lift)
+        if lift_input is None:
+            continue
+        rounding = lift_input.get('rounding', DEFAULT_ROUNDING)
+        roundings[lift] = rounding
+        weights = calculate_program_weights(one_rms[lift], rounding)
+        lift_input['weights'] = weights
+
+        if lift in program.get('calculated', {}):
+            retarget_calculated(program['calculated'][lift], weights)
+
+    if program.get('sessions'):
+        retarget_generated_sessions(
+            program['sessions'],
+            {lift: one_rms[lift] for lift in changed},
+            roundings
+        )
+
+    return changed
+
+
+def retarget_client(client: str, data_dir: Path = DEFAULT_DATA_DIR, dry_run: bool = False) -> List[Dict]:
+    """
+    Retarget all draft/active programs of a client
+
+    Returns:
+        List of {'path', 'lifts'} for programs that changed
+
+    Raises:
+        FileNotFoundError if the client has no profile
+        ConcurrentModificationError / LockTimeoutError if the batch write failed
+    """
+    profile = json_codec.loads(profile_path(data_dir, client).read_bytes())
+    one_rms = latest_one_rms(profile)
+
+    batch = []
+    changes = []
+    for path in iter_program_files(data_dir, [client]):
+        program, version = read_json_versioned(path)
+        if program.get('meta', {}).get('status') not in RETARGET_STATUSES:
+            continue
+        lifts = retarget_program(program, one_rms)
+        if lifts:
+            batch.append((path, program, version))
+            changes.append({'path': path, 'lifts': lifts})
+
+    if batch and not dry_run:
+        save_all_if_unchanged(batch)
+
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retarget weights of a client's programs to the latest 1RM")
+    parser.add_argument('client', help='Client slug (e.g. katerina-balasova)')
+    parser.add_argument('--data-dir', default=str(DEFAULT_DATA_DIR))
+    parser.add_argument('--dry-run', action='store_true', help='Only show what would change')
+    args = parser.parse_args()
+
+    data_dir = Path(args.data_dir)
+    print(f"🎯 Retargeting: {args.client}{' (dry run)' if args.dry_run else ''}\n")
+
+    try:
+        changes = retarget_client(args.client, data_dir, args.dry_run)
+    except FileNotFoundError as e:
+        print(f"❌ Error: File not found: {e.filename}")
+        sys.exit(1)
+    except (ConcurrentModificationError, LockTimeoutError) as e:
+        print(f"❌ Save failed, no program was changed: {e}")
+        sys.exit(1)
+
+    for change in changes:
+        print(f"   {change['path'].name}: {', '.join(change['lifts'])}")
+
+    if not changes:
+        print("✅ All draft/active programs already use the latest 1RM")
+    elif args.dry_run:
+        print(f"\n   {len(changes)} programs would be updated")
+    else:
+        print(f"\n✅ Updated {len(changes)} programs")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Weekly scheduler: assign every lift's sessions to real training days
+
+Honours profile `preferences`:
+- training_days: days the client can train
+- sessions_per_week: max number of distinct training days
+- session_duration_minutes: max lifts per day (LIFT_SESSION_MINUTES each)
+
+Among all feasible schedules it picks the one with
+1. fewest back-to-back sessions of the same lift (recovery), then
+2. most even per-day rep load (smallest sum of squared day loads).
+
+The search is a branch and bound (exact within MAX_SEARCH_NODES nodes,
+best found so far beyond that), and whole problems are cached, so a
+roster where many clients share the same setup is scheduled in one pass.
+
+Usage: python scheduler.py [data_dir]
+"""
+
+import sys
+from functools import lru_cache
+from itertools import combinations
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from constants import DAYS_OF_WEEK, LIFT_SESSION_MINUTES
+
+
+DEFAULT_DATA_DIR = Path(__file__).parent.parent / 'data'
+
+# Search budget per problem; past it the best schedule found so far is used
+MAX_SEARCH_NODES = 10000
+
+
+def max_lifts_per_day(session_duration_minutes: Optional[int]) -> Optional[int]:
+    """
+    Max number of lifts that fit into one session
+
+    Example:
+        >>> max_lifts_per_day(90)
+        3
+    """
+    if not session_duration_minutes:
+        return None
+    return max(1, session_duration_minutes // LIFT_SESSION_MINUTES)
+
+
+def _consecutive_pairs(days: Tuple[int, ...], combo: Tuple[int, ...]) -> int:
+    """Count back-to-back days (weekday indices, week wraps around) in a lift's combo"""
+    if len(combo) < 2:
+        return 0
+    chosen = sorted(days[i] for i in combo)
+    pairs = sum(1 for a, b in zip(chosen, chosen[1:]) if b - a == 1)
+    if chosen[0] == 0 and chosen[-1] == 6:
+        pairs += 1
+    return pairs
+
+
+def _min_sum_sq(day_loads: List[float], remaining: float) -> float:
+    """
+    Lower bound on the final sum of squared day loads
+
+    Smallest sum((load + extra) ** 2) over all ways to spread `remaining`
+    over the days (water filling: raise the lightest days to a common level).
+    """
+    loads = sorted(day_loads)
+    prefix = 0.0
+    for k in range(1, len(loads) + 1):
+        prefix += loads[k - 1]
+        level = (prefix + remaining) / k
+        if k == len(loads) or level <= loads[k]:
+            return k * level * level + sum(x * x for x in loads[k:])
+    return 0.0
+
+
+@lru_cache(maxsize=4096)
+def _solve(
+    available: Tuple[int, ...],
+    n_days: int,
+    lift_loads: Tuple[Tuple[float, ...], ...],
+    per_day_cap: Optional[int]
+):
+    """
+    Best schedule over all n_days subsets of available days
+
+    Depth-first branch and bound, lifts with most sessions first and each
+    lift's day combinations cheapest first, so a good schedule is found
+    early. A branch is cut when its lower bound (pairs so far + fewest
+    pairs the remaining lifts can have, water-filled sum of squares) can't
+    beat the best schedule found. Per-day counts from which no feasible
+    schedule exists are remembered. After MAX_SEARCH_NODES nodes the best
+    schedule found so far is returned.
+
+    Args:
+        available: Allowed weekday indices (sorted)
+        n_days: Number of distinct training days
+        lift_loads: Per lift, per session load (sessions in weekly order)
+        per_day_cap: Max lifts per day (None = unlimited)
+
+    Returns:
+        ((consecutive_pairs, sum_sq_load), days, (combo per lift)) or None if infeasible
+    """
+    n_lifts = len(lift_loads)
+    order = sorted(range(n_lifts), key=lambda i: (-len(lift_loads[i]), -sum(lift_loads[i]), i))
+    remaining_load = [sum(sum(lift_loads[i]) for i in order[k:]) for k in range(n_lifts + 1)]
+
+    best = None
+    nodes = 0
+
+    for days in combinations(available, n_days):
+        combos = [
+            [(combo, _consecutive_pairs(days, combo)) for combo in combinations(range(n_days), len(loads))]
+            for loads in lift_loads
+        ]
+        min_pairs = [min(pairs for _, pairs in lift_combos) for lift_combos in combos]
+        remaining_pairs = [sum(min_pairs[i] for i in order[k:]) for k in range(n_lifts + 1)]
+        infeasible = set()
+        assignment = [None] * n_lifts
+
+        def search(k: int, counts: Tuple[int, ...], day_loads: List[float], pairs: int) -> bool:
+            """Returns False only if no feasible schedule exists from this state"""
+            nonlocal best, nodes
+            if k == n_lifts:
+                cost = (pairs, round(sum(load * load for load in day_loads), 6))
+                if best is None or cost < best[0]:
+                    best = (cost, days, tuple(assignment))
+                return True
+
+            if (k, counts) in infeasible:
+                return False
+            nodes += 1
+
+            lift = order[k]
+            candidates = []
+            for combo, combo_pairs in combos[lift]:
+                if per_day_cap is not None and any(counts[d] >= per_day_cap for d in combo):
+                    continue
+                new_loads = list(day_loads)
+                for session_idx, d in enumerate(combo):
+                    new_loads[d] += lift_loads[lift][session_idx]
+                candidates.append((combo_pairs, sum(x * x for x in new_loads), combo, new_loads))
+            candidates.sort(key=lambda c: (c[0], c[1]))
+
+            feasible = False
+            for combo_pairs, _, combo, new_loads in candidates:
+                if best is not None:
+                    if nodes > MAX_SEARCH_NODES:
+                        return True
+                    bound = (
+                        pairs + combo_pairs + remaining_pairs[k + 1],
+                        round(_min_sum_sq(new_loads, remaining_load[k + 1]), 6),
+                    )
+                    if bound >= best[0]:
+                        feasible = True
+                        continue
+
+                new_counts = list(counts)
+                for d in combo:
+                    new_counts[d] += 1
+                assignment[lift] = combo
+                if search(k + 1, tuple(new_counts), new_loads, pairs + combo_pairs):
+                    feasible = True
+
+            if not feasible:
+                infeasible.add((k, counts))
+            return feasible
+
+        search(0, (0,) * n_days, [0.0] * n_days, 0)
+
+    return best
+
+
+def schedule_lifts(
+    lift_loads: Dict[str, List[float]],
+    training_days: Optional[List[str]] = None,
+    sessions_per_week: Optional[int] = None,
+    session_duration_minutes: Optional[int] = None
+) -> Dict[str, List[str]]:
+    """
+    Assign each lift's weekly sessions to training days
+
+    Session i of a lift goes to the i-th of its days in weekday order,
+    so session distributions (e.g. 25/33/42 %) keep their order in the week.
+
+    Args:
+        lift_loads: Lift -> expected reps per session (weekly order)
+        training_days: Allowed days (default: whole week)
+        sessions_per_week: Max distinct training days (default: all allowed days)
+        session_duration_minutes: Limits lifts per day
+
+    Returns:
+        Lift -> list of day names (one per session)
+
+    Raises:
+        ValueError if no schedule satisfies the constraints
+
+    Example:
+        >>> schedule_lifts({'squat': [25, 33, 42], 'bench_press': [25, 33, 42]},
+        ...                ['monday', 'wednesday', 'friday'])
+        {'squat': ['monday', 'wednesday', 'friday'], 'bench_press': ['monday', 'wednesday', 'friday']}
+    """
+    if not lift_loads:
+        return {}
+
+    training_days = training_days or DAYS_OF_WEEK
+    unknown = [day for day in training_days if day not in DAYS_OF_WEEK]
+    if unknown:
+        raise ValueError(f"Unknown training days: {unknown}")
+
+    available = tuple(sorted({DAYS_OF_WEEK.index(day) for day in training_days}))
+    n_days = min(sessions_per_week or len(available), len(available))
+
+    lifts = list(lift_loads.keys())
+    loads = tuple(tuple(round(float(x), 6) for x in lift_loads[lift]) for lift in lifts)
+
+    most_sessions = max(len(lift_sessions) for lift_sessions in loads)
+    if most_sessions > n_days:
+        raise ValueError(
+            f"No feasible schedule: a lift needs {most_sessions} sessions "
+            f"but only {n_days} training days are allowed"
+        )
+
+    per_day_cap = max_lifts_per_day(session_duration_minutes)
+    result = _solve(available, n_days, loads, per_day_cap)
+    if result is None:
+        raise ValueError(
+            f"No feasible schedule: {sum(len(x) for x in loads)} lift sessions don't fit "
+            f"into {n_days} days with max {per_day_cap} lifts per day"
+        )
+
+    _, days, combos = result
+    return {
+        lift: [DAYS_OF_WEEK[days[i]] for i in combo]
+        for lift, combo in zip(lifts, combos)
+    }
+
+
+def schedule_from_preferences(lift_loads: Dict[str, List[float]], preferences: Dict) -> Dict[str, List[str]]:
+    """schedule_lifts() with constraints taken from profile `preferences`"""
+    return schedule_lifts(
+        lift_loads,
+        preferences.get('training_days'),
+        preferences.get('sessions_per_week'),
+        preferences.get('session_duration_minutes'),
+    )
+
+
+def schedule_roster(data_dir: Path = DEFAULT_DATA_DIR):
+    """
+    Schedule every program of every client with training preferences
+
+    Yields:
+        (client_slug, program_filename, schedule or error message)
+    """
+    from calculate_targets import lift_session_loads
+    import json_codec
+    from layout import client_index, iter_client_dirs, iter_program_files
+
+    index = client_index(data_dir)
+    for client_dir in iter_client_dirs(data_dir, index):
+        profile_path = client_dir / 'profile.json'
+        if not profile_path.exists():
+            continue
+        profile = json_codec.loads(profile_path.read_bytes())
+        preferences = profile.get('preferences')
+        if not preferences:
+            continue
+
+        for program_path in iter_program_files(data_dir, [client_dir.name], index):
+            program = json_codec.loads(program_path.read_bytes())
+            try:
+                schedule = schedule_from_preferences(lift_session_loads(program), preferences)
+            except ValueError as e:
+                schedule = str(e)
+            yield profile_path.parent.name, program_path.name, schedule
+
+
+def main():
+    data_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_DATA_DIR
+    print(f"📅 Scheduling roster: {data_dir}\n")
+
+    count = 0
+    for client, program_name, schedule in schedule_roster(data_dir):
+        count += 1
+        print(f"   {client} / {program_name}")
+        if isinstance(schedule, str):
+            print(f"     ❌ {schedule}")
+            continue
+        for lift, days in schedule.items():
+            print(f"     {lift}: {', '.join(days)}")
+
+    print(f"\n✅ Scheduled {count} programs")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,291 @@
+"""
+Safe file access for StrongCode data files
+
+Per-file advisory locks and compare-and-swap saves, so that parallel
+requests touching different programs/profiles never wait on each other,
+while two writers of the same file can't silently lose an update.
+
+Typical read-modify-write:
+
+    data, version = read_json_versioned(path)
+    data['status'] = 'active'
+    save_if_unchanged(path, data, version)   # raises ConcurrentModificationError
+"""
+
+import hashlib
+import os
+import stat
+import tempfile
+import time
+from contextlib import contextmanager, ExitStack
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Tuple
+
+import json_codec
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+# Default time to wait for a lock (seconds)
+DEFAULT_LOCK_TIMEOUT = 10.0
+
+# Delay between lock attempts (seconds)
+LOCK_POLL_INTERVAL = 0.05
+
+
+class LockTimeoutError(Exception):
+    """Lock could not be acquired within the timeout"""
+
+
+class ConcurrentModificationError(Exception):
+    """File changed since it was loaded"""
+
+
+def lock_path_for(filepath) -> Path:
+    """
+    Get advisory lock file path for a data file
+
+    Example:
+        >>> lock_path_for('data/clients/katerina-balasova/profile.json')
+        PosixPath('data/clients/katerina-balasova/.profile.json.lock')
+    """
+    filepath = Path(filepath)
+    return filepath.parent / f'.{filepath.name}.lock'
+
+
+def _try_lock(fd: int) -> bool:
+    """Try to take exclusive lock without blocking"""
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock(fd: int):
+    """Release lock taken by _try_lock"""
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+def _is_current(fd: int, lock_file: Path) -> bool:
+    """Is fd still the sidecar at lock_file (not one removed by file_lock)?"""
+    try:
+        st = os.stat(lock_file)
+    except FileNotFoundError:
+        return False
+    return os.path.samestat(os.fstat(fd), st)
+
+
+@contextmanager
+def file_lock(filepath, timeout: float = DEFAULT_LOCK_TIMEOUT) -> Iterator[None]:
+    """
+    Hold exclusive advisory lock for one data file (program or profile)
+
+    The lock lives in a hidden sidecar file next to the data file, so it
+    survives the atomic replace done by atomic_write_json(). The sidecar is
+    removed on release if the data file no longer exists (deleted by the
+    holder, or never created).
+
+    Args:
+        filepath: Data file to lock
+        timeout: Seconds to wait before giving up
+
+    Raises:
+        LockTimeoutError if the lock is still held by someone else after timeout
+    """
+    lock_file = lock_path_for(filepath)
+    lock_file.parent.mkdir(parents=True, exist_ok=True)
+    deadline = time.monotonic() + timeout
+    while True:
+        fd = os.open(lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            while not _try_lock(fd):
+                if time.monotonic() >= deadline:
+                    raise LockTimeoutError(f"Timed out after {timeout}s waiting for lock: {filepath}")
+                time.sleep(LOCK_POLL_INTERVAL)
+        except BaseException:
+            os.close(fd)
+            raise
+        if _is_current(fd, lock_file):
+            break
+        # Previous holder removed the sidecar while we waited: lock a fresh one
+        _unlock(fd)
+        os.close(fd)
+
+    try:
+        yield
+    finally:
+        if not os.path.exists(filepath):
+            try:
+                os.unlink(lock_file)
+            except OSError:
+                pass
+        _unlock(fd)
+        os.close(fd)
+
+
+def content_version(raw: bytes) -> str:
+    """Version token for file contents (sha256 hex digest)"""
+    return hashlib.sha256(raw).hexdigest()
+
+
+def file_version(filepath) -> Optional[str]:
+    """
+    Get current version token of a file
+
+    Returns:
+        Version token, or None if the file does not exist
+    """
+    try:
+        with open(filepath, 'rb') as f:
+            return content_version(f.read())
+    except FileNotFoundError:
+        return None
+
+
+def read_json_versioned(filepath) -> Tuple[Any, str]:
+    """
+    Load JSON file together with its version token
+
+    Both come from the same read, so the token matches exactly what was parsed.
+
+    Returns:
+        Tuple of (data, version)
+
+    Raises:
+        FileNotFoundError, json.JSONDecodeError
+    """
+    with open(filepath, 'rb') as f:
+        raw = f.read()
+    return json_codec.loads(raw), content_version(raw)
+
+
+def dump_json_bytes(data: Any) -> bytes:
+    """Serialize data the same way as all StrongCode data files (indent=2, UTF-8)"""
+    return json_codec.dumps(data, indent=2)
+
+
+def _file_mode(filepath: Path) -> int:
+    """Permission bits of an existing file, or the umask default for a new one"""
+    try:
+        return stat.S_IMODE(os.stat(filepath).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def atomic_write_bytes(filepath, raw: bytes):
+    """
+    Write file atomically (temp file in same directory + os.replace)
+
+    Readers always see either the old or the new complete file. The file
+    keeps its permissions (mkstemp alone would leave it 0600).
+    """
+    filepath = Path(filepath)
+    fd, tmp_path = tempfile.mkstemp(dir=filepath.parent, prefix=f'.{filepath.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(raw)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, _file_mode(filepath))
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def atomic_write_json(filepath, data: Any) -> str:
+    """
+    Write JSON file atomically (and update the client manifest, if any)
+
+    Returns:
+        Version token of the written contents
+    """
+    from layout import record_write
+
+    raw = dump_json_bytes(data)
+    atomic_write_bytes(filepath, raw)
+    record_write(filepath)
+    return content_version(raw)
+
+
+def save_if_unchanged(
+    filepath,
+    data: Any,
+    expected_version: Optional[str],
+    timeout: float = DEFAULT_LOCK_TIMEOUT
+) -> str:
+    """
+    Compare-and-swap save
+
+    Writes `data` only if the file still has `expected_version`
+    (None = file must not exist yet). The check and the write happen
+    under the file's lock.
+
+    Args:
+        filepath: Data file
+        data: New contents
+        expected_version: Version token from read_json_versioned()
+        timeout: Lock timeout in seconds
+
+    Returns:
+        New version token
+
+    Raises:
+        ConcurrentModificationError if the file changed since it was loaded
+        LockTimeoutError if the lock could not be acquired
+    """
+    with file_lock(filepath, timeout):
+        current_version = file_version(filepath)
+        if current_version != expected_version:
+            raise ConcurrentModificationError(f"File changed since it was loaded: {filepath}")
+        return atomic_write_json(filepath, data)
+
+
+def save_all_if_unchanged(
+    items: List[Tuple[Any, Any, Optional[str]]],
+    timeout: float = DEFAULT_LOCK_TIMEOUT
+) -> List[str]:
+    """
+    Compare-and-swap save of several files as one batch
+
+    Locks all files (in sorted path order, so concurrent batches can't
+    deadlock), checks that none changed, then writes each one atomically.
+    If any file changed, nothing is written.
+
+    Args:
+        items: List of (filepath, data, expected_version)
+        timeout: Lock timeout in seconds (per file)
+
+    Returns:
+        New version tokens, in the order of items
+
+    Raises:
+        ConcurrentModificationError if any file changed since it was loaded
+        LockTimeoutError if a lock could not be acquired
+    """
+    with ExitStack() as stack:
+        for filepath in sorted({str(Path(item[0]).resolve()) for item in items}):
+            stack.enter_context(file_lock(filepath, timeout))
+
+        for filepath, _, expected_version in items:
+            if file_version(filepath) != expected_version:
+                raise ConcurrentModificationError(f"File changed since it was loaded: {filepath}")
+
+        return [atomic_write_json(filepath, data) for filepath, data, _ in items]
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Program templates
+
+A template (data/templates/<id>.json) defines a block's `input` per lift
+without weights - everything in it is relative to the 1RM:
+
+    {
+      "name": "Prep, all lifts, 4 weeks",
+      "program_info": {"block": "prep", "weeks": 4},
+      "input": {
+        "squat": {"volume": 350, "rounding": 2.5, "intensity_distribution": {...},
+                  "volume_pattern_main": "3a", "volume_pattern_8190": "3a",
+                  "sessions_per_week": 3, "session_distribution": "d25_33_42"}
+      }
+    }
+
+Rep targets don't depend on the 1RM, so each template is calculated once
+(calculate_program_targets with zero weights, stored in the calculation
+cache) and every program created from it only gets:
+- client data and 1RM from the profile (latest one_rm_history entry)
+- weights per lift (calculate_program_weights) and tonnage (as in retarget.py)
+- session days from the client's preferences (scheduler.py), if any
+
+Usage:
+    python templates.py list
+    python templates.py compile [template_id ...]
+    python templates.py create <template_id> --start-date YYYY-MM-DD --client SLUG [--client SLUG ...] [--dry-run]
+"""
+
+import sys
+import copy
+import argparse
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import json_codec
+from constants import DEFAULT_ROUNDING
+from utilities import calculate_program_weights
+from dedup import calculate_with_cache
+from layout import client_dir
+from retarget import latest_one_rms, retarget_calculated
+from scheduler import schedule_from_preferences
+from storage import save_all_if_unchanged, ConcurrentModificationError, LockTimeoutError
+
+
+DEFAULT_DATA_DIR = Path(__file__).parent.parent / 'data'
+
+# Precompiled templates (calculation cache entries, see dedup.py), relative to data dir
+TEMPLATE_CACHE_SUBDIR = Path('cache') / 'templates'
+
+# Lifts named 'all-lifts' in program filenames (as in the web form)
+COMPETITION_LIFTS = ('squat', 'bench_press', 'deadlift')
+
+# Status of programs created from a template
+DEFAULT_STATUS = 'draft'
+
+
+def templates_dir(data_dir) -> Path:
+    return Path(data_dir) / 'templates'
+
+
+def list_templates(data_dir: Path = DEFAULT_DATA_DIR) -> List[str]:
+    """Template ids (file stems in data/templates/)"""
+    return sorted(p.stem for p in templates_dir(data_dir).glob('*.json'))
+
+
+def load_template(template_id: str, data_dir: Path = DEFAULT_DATA_DIR) -> Dict:
+    """Load template by id (FileNotFoundError if it doesn't exist)"""
+    return json_codec.loads((templates_dir(data_dir) / f'{template_id}.json').read_bytes())
+
+
+def template_program(template: Dict) -> Dict:
+    """
+    Program the template is calculated as: input with zero weights, 1RM 0
+
+    Weights only feed tonnage, which instantiate_template() recomputes.
+    """
+    input_data = {}
+    for lift, lift_config in template['input'].items():
+        input_data[lift] = {
+            **lift_config,
+            'weights': calculate_program_weights(0, lift_config.get('rounding', DEFAULT_ROUNDING)),
+        }
+    return {
+        'client': {'one_rm': {lift: 0 for lift in input_data}},
+        'program_info': dict(template['program_info']),
+        'input': input_data,
+    }
+
+
+def compile_template(template: Dict, cache_dir: Path = DEFAULT_DATA_DIR / TEMPLATE_CACHE_SUBDIR) -> Tuple[Dict, bool]:
+    """
+    Calculated targets of a template (computed on first use, then cached)
+
+    Returns:
+        Tuple of (calculated, cache_hit)
+    """
+    return calculate_with_cache(template_program(template), cache_dir)
+
+
+def program_filename(start_date: str, block: str, lifts: List[str]) -> str:
+    """
+    YYYY-MM-DD_block_lifts.json, as in the program schema
+
+    Example:
+        >>> program_filename('2026-03-02', 'prep', ['bench_press'])
+        '2026-03-02_prep_bench-press.json'
+    """
+    if set(lifts) == set(COMPETITION_LIFTS):
+        lift_part = 'all-lifts'
+    else:
+        lift_part = '-'.join(lift.replace('_', '-') for lift in lifts)
+    return f'{start_date}_{block}_{lift_part}.json'
+
+
+def instantiate_template(
+    template_id: str,
+    template: Dict,
+    calculated: Dict,
+    profile: Dict,
+    start_date: str,
+    status: str = DEFAULT_STATUS
+) -> Dict:
+    """
+    Create a program for one client from a compiled template
+
+    Lifts without 1RM in the profile are left out.
+
+    Args:
+        template_id: Template id (stored in meta.template)
+        template: Template
+        calculated: Output of compile_template()
+        profile: Client profile
+        start_date: 'YYYY-MM-DD'
+        status: meta.status
+
+    Returns:
+        Program dict
+
+    Raises:
+        ValueError if the client has no 1RM for any template lift, or the
+        sessions don't fit the client's training preferences
+    """
+    one_rms = latest_one_rms(profile)
+    lifts = [lift for lift in template['input'] if lift in one_rms]
+    if not lifts:
+        raise ValueError(f"No 1RM for any of {', '.join(template['input'])}")
+
+    weeks = template['program_info']['weeks']
+    end_date = date.fromisoformat(start_date) + timedelta(days=7 * weeks)
+    block = template['program_info']['block']
+
+    program = {
+        'schema_version': '1.0',
+        'meta': {
+            'filename': program_filename(start_date, block, lifts),
+            'created_at': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+            'created_by': f'Template: {template_id}',
+            'status': status,
+            'template': template_id,
+        },
+        'client': {
+            'name': profile.get('name', ''),
+            'delta': profile.get('skill_level', 'intermediate'),
+            'one_rm': {lift: one_rms[lift] for lift in lifts},
+        },
+        'program_info': {
+            **template['program_info'],
+            'start_date': start_date,
+            'end_date': end_date.isoformat(),
+        },
+        'input': {},
+        'calculated': {},
+    }
+
+    for lift in lifts:
+        lift_config = template['input'][lift]
+        weights = calculate_program_weights(one_rms[lift], lift_config.get('rounding', DEFAULT_ROUNDING))
+        program['input'][lift] = {**copy.deepcopy(lift_config), 'weights': weights}
+
+        lift_targets = copy.deepcopy(calculated[lift])
+        retarget_calculated(lift_targets, weights)
+        program['calculated'][lift] = lift_targets
+
+    preferences = profile.get('preferences')
+    if preferences:
+        from calculate_targets import lift_session_loads
+        lift_days = schedule_from_preferences(lift_session_loads(program), preferences)
+        for lift, days in lift_days.items():
+            reschedule_sessions(program['calculated'][lift], days)
+
+    return program
+
+
+def reschedule_sessions(lift_targets: Dict, days: List[str]):
+    """Move sessions of every week onto `days` (in session order, in place)"""
+    for key, week in lift_targets.items():
+        if key.startswith('week_') and 'sessions' in week:
+            week['sessions'] = dict(zip(days, week['sessions'].values()))
+
+
+def create_team_programs(
+    template_id: str,
+    clients: List[str],
+    start_date: str,
+    data_dir: Path = DEFAULT_DATA_DIR,
+    cache_dir: Optional[Path] = None,
+    status: str = DEFAULT_STATUS,
+    dry_run: bool = False
+) -> List[Tuple[Path, Dict]]:
+    """
+    Create programs from one template for several clients in one batch
+
+    The template is compiled (or loaded from cache) once. All programs are
+    written together: if any of the files already exists, none is written.
+
+    Args:
+        cache_dir: Precompiled templates (default: <data_dir>/cache/templates)
+
+    Returns:
+        List of (path, program)
+
+    Raises:
+        FileNotFoundError if the template or a client profile is missing
+        FileExistsError if a client already has a program with the same filename
+        ValueError if a program can't be created for a client
+        ConcurrentModificationError if a program file was created meanwhile
+        LockTimeoutError if a lock could not be acquired
+    """
+    template = load_template(template_id, data_dir)
+    calculated, _ = compile_template(template, cache_dir or Path(data_dir) / TEMPLATE_CACHE_SUBDIR)
+
+    batch = []
+    for slug in clients:
+        cdir = client_dir(data_dir, slug)
+        profile = json_codec.loads((cdir / 'profile.json').read_bytes())
+        try:
+            program = instantiate_template(template_id, template, calculated, profile, start_date, status)
+        except ValueError as e:
+            raise ValueError(f"{slug}: {e}") from e
+        path = cdir / 'programs' / program['meta']['filename']
+        if path.exists():
+            raise FileExistsError(f"Program already exists: {path}")
+        batch.append((path, program))
+
+    if not dry_run:
+        for path, _ in batch:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        save_all_if_unchanged([(path, program, None) for path, program in batch])
+
+    return batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Create programs from precompiled templates')
+    parser.add_argument('--data-dir', default=str(DEFAULT_DATA_DIR))
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('list', help='List templates')
+
+    compile_parser = subparsers.add_parser('compile', help='Precompile templates (default: all)')
+    compile_parser.add_argument('templates', nargs='*')
+
+    create_parser = subparsers.add_parser('create', help='Create programs for clients from a template')
+    create_parser.add_argument('template')
+    create_parser.add_argument('--client', action='append', required=True, help='Client slug (repeatable)')
+    create_parser.add_argument('--start-date', required=True, help='YYYY-MM-DD')
+    create_parser.add_argument('--status', default=DEFAULT_STATUS, choices=['draft', 'active'])
+    create_parser.add_argument('--dry-run', action='store_true', help='Only show what would be created')
+
+    args = parser.parse_args()
+    data_dir = Path(args.data_dir)
+
+    if args.command == 'list':
+        for template_id in list_templates(data_dir):
+            template = load_template(template_id, data_dir)
+            print(f"   {template_id:<25} {template.get('name', '')} ({', '.join(template['input'])})")
+        return
+
+    if args.command == 'compile':
+        for template_id in args.templates or list_templates(data_dir):
+            _, hit = compile_template(load_template(template_id, data_dir), data_dir / TEMPLATE_CACHE_SUBDIR)
+            print(f"\n✅ {template_id}: {'already compiled' if hit else 'compiled'}")
+        return
+
+    try:
+        date.fromisoformat(args.start_date)
+        created = create_team_programs(
+            args.template, args.client, args.start_date, data_dir,
+            status=args.status, dry_run=args.dry_run
+        )
+    except FileNotFoundError as e:
+        print(f"❌ Error: File not found: {e.filename}")
+        sys.exit(1)
+    except (FileExistsError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+    except (ConcurrentModificationError, LockTimeoutError) as e:
+        print(f"❌ Save failed, no program was created: {e}")
+        sys.exit(1)
+
+    print(f"\n📄 {args.template} → {len(created)} programs{' (dry run)' if args.dry_run else ''}\n")
+    for path, program in created:
+        one_rm = ', '.join(f"{lift} {value}" for lift, value in program['client']['one_rm'].items())
+        print(f"   {path.relative_to(data_dir)}  ({one_rm})")
+
+    if not args.dry_run:
+        print(f"\n✅ Created {len(created)} programs")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,7 +3,7 @@ Utility functions for StrongCode calculations
 """
 
 from typing import Dict, List, Tuple
-from constants import ZONE_PERCENTAGES, DEFAULT_ROUNDING
+from constants import ZONE_PERCENTAGES, DEFAULT_ROUNDING, PEAK_ZONE_MIN_INTENSITY, PROGRAM_ZONE_ALIASES
 
 
 def calculate_weight(one_rm: float, percentage: int, rounding: float = DEFAULT_ROUNDING) -> float:
@@ -48,6 +48,38 @@ def calculate_all_weights(one_rm: float, rounding: float = DEFAULT_ROUNDING) ->
     return weights
 
 
+def zone_intensity(zone: str) -> float:
+    """
+    Relative intensity (% of 1RM) of an intensity zone key
+
+    Program zone '90' is the 92.5% zone (see PROGRAM_ZONE_ALIASES).
+
+    Example:
+        >>> zone_intensity('85'), zone_intensity('90')
+        (85, 92.5)
+    """
+    zone = PROGRAM_ZONE_ALIASES.get(zone, zone)
+    return ZONE_PERCENTAGES.get(zone, float(zone))
+
+
+def calculate_program_weights(one_rm: float, rounding: float = DEFAULT_ROUNDING) -> Dict[str, float]:
+    """
+    Calculate zone weights keyed like program `input[lift].weights`
+
+    Same as calculate_all_weights(), with zone keys from PROGRAM_ZONE_ALIASES
+    ('92' -> '90').
+
+    Example:
+        >>> calculate_program_weights(142.5, 2.5)
+        {'65': 92.5, '75': 107.5, '85': 120.0, '90': 132.5, '95': 135.0}
+    """
+    zone_keys = {zone: alias for alias, zone in PROGRAM_ZONE_ALIASES.items()}
+    return {
+        zone_keys.get(zone, zone): weight
+        for zone, weight in calculate_all_weights(one_rm, rounding).items()
+    }
+
+
 def calculate_ari(zone_reps: Dict[str, int]) -> float:
     """
     Calculate Average Relative Intensity (ARI)
@@ -85,6 +117,46 @@ def calculate_ari(zone_reps: Dict[str, int]) -> float:
     return round(total_intensity / total_reps, 1)
 
 
+def calculate_load_metrics(zone_reps: Dict[str, int], weights: Dict[str, float]) -> Dict[str, float]:
+    """
+    Calculate load metrics for a session, week or block
+
+    - tonnage: SUM(zone_reps × zone_weight) in kg
+    - inol: SUM(zone_reps / (100 - zone_intensity))
+    - peak_reps: reps in zones >= PEAK_ZONE_MIN_INTENSITY
+
+    Args:
+        zone_reps: Dictionary of zone -> reps count
+        weights: Dictionary of zone -> weight in kg
+
+    Returns:
+        Dictionary with tonnage, inol and peak_reps
+
+    Example:
+        >>> calculate_load_metrics({'65': 5, '75': 6, '85': 2}, {'65': 92.5, '75': 107.5, '85': 120})
+        {'tonnage': 1347.5, 'inol': 0.52, 'peak_reps': 0}
+    """
+    tonnage = 0.0
+    inol = 0.0
+    peak_reps = 0
+
+    for zone, reps in zone_reps.items():
+        if reps <= 0:
+            continue
+        intensity = zone_intensity(zone)
+        tonnage += reps * (weights.get(zone) or 0)
+        if intensity < 100:
+            inol += reps / (100 - intensity)
+        if intensity >= PEAK_ZONE_MIN_INTENSITY:
+            peak_reps += reps
+
+    return {
+        'tonnage': round(tonnage, 1),
+        'inol': round(inol, 2),
+        'peak_reps': peak_reps,
+    }
+
+
 def convert_absolute_reps_to_percent(
     total_nl: int,
     zone_75_pct: float,
@@ -10,12 +10,14 @@ from pathlib import Path
 from jsonschema import validate, ValidationError, Draft7Validator
 from jsonschema.exceptions import SchemaError
 
+import json_codec
+
 
 def load_json(filepath):
     """Load JSON file"""
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(filepath, 'rb') as f:
+            return json_codec.loads(f.read())
     except FileNotFoundError:
         print(f"❌ Error: File not found: {filepath}")
         sys.exit(1)